@@ -0,0 +1,222 @@
+# corpus.py
+import os
+import random
+import sqlite3
+import zipfile
+import docx
+from pptx import Presentation
+from pptx.util import Inches
+from PIL import Image, ImageDraw
+
+try:
+    import xlwt
+except ImportError:
+    xlwt = None
+
+NEEDLE = "benchneedle"
+WORDS = (
+    "alpha bravo charlie delta echo foxtrot golf hotel india juliet kilo lima mike november "
+    "oscar papa quebec romeo sierra tango uniform victor whiskey xray yankee zulu"
+).split()
+
+ODF_TEXT = "urn:oasis:names:tc:opendocument:xmlns:text:1.0"
+ODF_DRAW = "urn:oasis:names:tc:opendocument:xmlns:drawing:1.0"
+ODF_OFFICE = "urn:oasis:names:tc:opendocument:xmlns:office:1.0"
+ODF_TABLE = "urn:oasis:names:tc:opendocument:xmlns:table:1.0"
+XLSX_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+XLSX_RELATIONSHIPS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+class CorpusGenerator:
+    TEXT_SIZES = (1024, 16 * 1024, 256 * 1024, 4 * 1024 * 1024)
+    NEEDLE_RATE = 0.25
+
+    def __init__(self, root, seed=0, scale=1):
+        self.root = root
+        self.seed = seed
+        self.scale = scale
+        self.random = random.Random(seed)
+        self.expected = {}
+        self.skipped = []
+
+    def generate(self):
+        os.makedirs(self.root, exist_ok=True)
+        self.generate_text()
+        self.generate_pdf()
+        self.generate_docx()
+        self.generate_pptx()
+        self.generate_xls()
+        self.generate_xlsx()
+        self.generate_odt()
+        self.generate_odp()
+        self.generate_ods()
+        self.generate_sqlite()
+        self.generate_images()
+        return self.expected
+
+    def count(self, base):
+        return max(1, base * self.scale)
+
+    def path(self, kind, number, ext):
+        directory = os.path.join(self.root, kind, f"{number % 8:02d}")
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, f"{kind}-{number:05d}{ext}")
+
+    def sentence(self, words=12, needle=False):
+        chosen = [self.random.choice(WORDS) for _ in range(words)]
+        if needle:
+            chosen[self.random.randrange(words)] = NEEDLE
+        return " ".join(chosen)
+
+    def paragraphs(self, count, needle):
+        needle_at = self.random.randrange(count) if needle else None
+        return [self.sentence(needle=number == needle_at) for number in range(count)]
+
+    def wants_needle(self, file_type):
+        needle = self.random.random() < self.NEEDLE_RATE
+        if needle:
+            self.expected[file_type] = self.expected.get(file_type, 0) + 1
+        return needle
+
+    def generate_text(self):
+        number = 0
+        for size in self.TEXT_SIZES:
+            for _ in range(self.count(64 if size < 1024 * 1024 else 2)):
+                needle = self.wants_needle("*.txt")
+                lines = []
+                written = 0
+                while written < size:
+                    lines.append(self.sentence())
+                    written += len(lines[-1]) + 1
+                if needle:
+                    lines[self.random.randrange(len(lines))] = self.sentence(needle=True)
+                with open(self.path("text", number, ".txt"), "w") as file:
+                    file.write("\n".join(lines) + "\n")
+                number += 1
+
+    def generate_pdf(self):
+        for number in range(self.count(16)):
+            pages = self.paragraphs(self.random.randint(1, 8), self.wants_needle("*.pdf"))
+            with open(self.path("pdf", number, ".pdf"), "wb") as file:
+                file.write(self.build_pdf(pages))
+
+    def build_pdf(self, pages):
+        objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+        kids = []
+        for text in pages:
+            stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode("latin-1")
+            objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+            objects.append(
+                b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (len(objects))
+            )
+            kids.append(b"%d 0 R" % len(objects))
+        objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), len(kids))
+        output = bytearray(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, 1):
+            offsets.append(len(output))
+            output += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+        xref = len(output)
+        output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+        for offset in offsets:
+            output += b"%010d 00000 n \n" % offset
+        output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+        return bytes(output)
+
+    def generate_docx(self):
+        for number in range(self.count(16)):
+            document = docx.Document()
+            for paragraph in self.paragraphs(self.random.randint(5, 50), self.wants_needle("*.doc")):
+                document.add_paragraph(paragraph)
+            document.save(self.path("doc", number, ".doc"))
+
+    def generate_pptx(self):
+        for number in range(self.count(8)):
+            presentation = Presentation()
+            for text in self.paragraphs(self.random.randint(2, 10), self.wants_needle("*.pptx")):
+                slide = presentation.slides.add_slide(presentation.slide_layouts[5])
+                slide.shapes.title.text = self.sentence(4)
+                slide.shapes.add_textbox(Inches(1), Inches(2), Inches(8), Inches(1)).text_frame.text = text
+            presentation.save(self.path("pptx", number, ".pptx"))
+
+    def generate_xls(self):
+        if xlwt is None:
+            self.skipped.append("*.xls (xlwt is not installed)")
+            return
+        for number in range(self.count(8)):
+            workbook = xlwt.Workbook()
+            rows = self.paragraphs(self.random.randint(50, 500), self.wants_needle("*.xls"))
+            sheet = workbook.add_sheet("Data")
+            for row, text in enumerate(rows):
+                for column, word in enumerate(text.split()[:6]):
+                    sheet.write(row, column, word)
+                sheet.write(row, 6, text)
+            workbook.save(self.path("xls", number, ".xls"))
+
+    def generate_xlsx(self):
+        for number in range(self.count(8)):
+            rows = self.paragraphs(self.random.randint(50, 500), self.wants_needle("*.xlsx"))
+            strings = sorted(set(word for text in rows for word in text.split()[:6]))
+            index = {word: position for position, word in enumerate(strings)}
+            sheet_rows = []
+            for row, text in enumerate(rows, 1):
+                cells = "".join(f'<c r="{chr(65 + column)}{row}" t="s"><v>{index[word]}</v></c>' for column, word in enumerate(text.split()[:6]))
+                sheet_rows.append(f'<row r="{row}">{cells}<c r="G{row}" t="inlineStr"><is><t>{text}</t></is></c></row>')
+            with zipfile.ZipFile(self.path("xlsx", number, ".xlsx"), "w", zipfile.ZIP_DEFLATED) as archive:
+                archive.writestr("xl/workbook.xml", f'<workbook xmlns="{XLSX_MAIN}" xmlns:r="{XLSX_RELATIONSHIPS}"><sheets><sheet name="Data" sheetId="1" r:id="rId1"/></sheets></workbook>')
+                archive.writestr("xl/_rels/workbook.xml.rels", '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships"><Relationship Id="rId1" Target="worksheets/sheet1.xml"/></Relationships>')
+                archive.writestr("xl/sharedStrings.xml", f'<sst xmlns="{XLSX_MAIN}">' + "".join(f"<si><t>{word}</t></si>" for word in strings) + "</sst>")
+                archive.writestr("xl/worksheets/sheet1.xml", f'<worksheet xmlns="{XLSX_MAIN}"><sheetData>{"".join(sheet_rows)}</sheetData></worksheet>')
+
+    def write_odf(self, file_path, mimetype, body):
+        content = (
+            f'<?xml version="1.0" encoding="UTF-8"?>'
+            f'<office:document-content xmlns:office="{ODF_OFFICE}" xmlns:text="{ODF_TEXT}" xmlns:draw="{ODF_DRAW}" xmlns:table="{ODF_TABLE}">'
+            f'<office:body>{body}</office:body></office:document-content>'
+        )
+        with zipfile.ZipFile(file_path, "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr(zipfile.ZipInfo("mimetype"), mimetype)
+            archive.writestr("content.xml", content)
+
+    def generate_odt(self):
+        for number in range(self.count(16)):
+            paragraphs = self.paragraphs(self.random.randint(5, 50), self.wants_needle("*.odt"))
+            body = "<office:text>" + "".join(f"<text:p>{text}</text:p>" for text in paragraphs) + "</office:text>"
+            self.write_odf(self.path("odt", number, ".odt"), "application/vnd.oasis.opendocument.text", body)
+
+    def generate_odp(self):
+        for number in range(self.count(8)):
+            slides = self.paragraphs(self.random.randint(2, 10), self.wants_needle("*.odp"))
+            pages = "".join(f'<draw:page draw:name="{index}"><text:p>{text}</text:p></draw:page>' for index, text in enumerate(slides, 1))
+            self.write_odf(self.path("odp", number, ".odp"), "application/vnd.oasis.opendocument.presentation", f"<office:presentation>{pages}</office:presentation>")
+
+    def generate_ods(self):
+        for number in range(self.count(8)):
+            rows = self.paragraphs(self.random.randint(50, 500), self.wants_needle("*.ods"))
+            table = "".join(
+                "<table:table-row>" + "".join(f"<table:table-cell><text:p>{word}</text:p></table:table-cell>" for word in text.split()[:6] + [text]) + "</table:table-row>"
+                for text in rows
+            )
+            body = f'<office:spreadsheet><table:table table:name="Data">{table}</table:table></office:spreadsheet>'
+            self.write_odf(self.path("ods", number, ".ods"), "application/vnd.oasis.opendocument.spreadsheet", body)
+
+    def generate_sqlite(self):
+        for number in range(self.count(4)):
+            file_path = self.path("sqlite", number, ".sqlite")
+            if os.path.exists(file_path):
+                os.remove(file_path)
+            rows = self.paragraphs(self.random.randint(1000, 5000), self.wants_needle("*.sqlite"))
+            with sqlite3.connect(file_path) as conn:
+                conn.execute("CREATE TABLE notes (id INTEGER PRIMARY KEY, title TEXT, body TEXT, score REAL)")
+                conn.executemany(
+                    "INSERT INTO notes (title, body, score) VALUES (?, ?, ?)",
+                    ((text.split()[0], text, self.random.random()) for text in rows)
+                )
+            conn.close()
+
+    def generate_images(self):
+        for number in range(self.count(8)):
+            image = Image.new("L", (800, 200), 255)
+            draw = ImageDraw.Draw(image)
+            for line, text in enumerate(self.paragraphs(3, self.wants_needle("*.png"))):
+                draw.text((10, 20 + line * 50), text, fill=0)
+            image.save(self.path("image", number, ".png"))
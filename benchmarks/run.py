@@ -0,0 +1,205 @@
+# run.py
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from benchmarks.corpus import NEEDLE, CorpusGenerator
+from searcher import Searcher
+
+CASES = {
+    "all": [],
+    "TextHandler": ["*.txt"],
+    "PDFHandler": ["*.pdf"],
+    "DocHandler": ["*.doc"],
+    "PPTXHandler": ["*.pptx"],
+    "XLSHandler": ["*.xls"],
+    "XLSXHandler": ["*.xlsx"],
+    "ODTHandler": ["*.odt"],
+    "ODPHandler": ["*.odp"],
+    "ODSHandler": ["*.ods"],
+    "SQLiteHandler": ["*.sqlite"],
+    "CompositeHandler": ["*.png"],
+}
+HIGHER_IS_BETTER = ("files_per_second", "mb_per_second")
+LOWER_IS_BETTER = ("first_result_seconds", "peak_rss_mb", "peak_worker_rss_mb")
+MANIFEST = "corpus.json"
+
+def max_rss_mb(who):
+    rss = resource.getrusage(who).ru_maxrss
+    if sys.platform != "darwin":
+        rss *= 1024
+    return rss / (1024 * 1024)
+
+def peak_rss_mb():
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return max_rss_mb(resource.RUSAGE_SELF)
+
+def prepare_corpus(corpus, seed, scale, regenerate=False):
+    manifest_path = os.path.join(corpus, MANIFEST)
+    if not regenerate and os.path.exists(manifest_path):
+        with open(manifest_path) as file:
+            manifest = json.load(file)
+        if manifest["seed"] == seed and manifest["scale"] == scale:
+            return manifest
+    generator = CorpusGenerator(corpus, seed, scale)
+    manifest = {"seed": seed, "scale": scale, "expected": generator.generate(), "skipped": generator.skipped}
+    with open(manifest_path, "w") as file:
+        json.dump(manifest, file, indent=4)
+    return manifest
+
+def run_case(corpus, file_types, executor, jobs, results):
+    try:
+        searcher = Searcher([NEEDLE], file_types, [corpus], False, True, [], False, False, True, executor=executor, jobs=jobs)
+        start = time.perf_counter()
+        first = None
+        matches = 0
+        for _ in searcher.search_files():
+            if first is None:
+                first = time.perf_counter() - start
+            matches += 1
+        elapsed = time.perf_counter() - start
+        items = list(searcher.scan())
+        size = sum(os.path.getsize(file_path) for file_path, _ in items)
+        results.put({
+            "files": len(items),
+            "bytes": size,
+            "matches": matches,
+            "seconds": elapsed,
+            "first_result_seconds": first,
+            "peak_rss_mb": peak_rss_mb(),
+            "peak_worker_rss_mb": max_rss_mb(resource.RUSAGE_CHILDREN),
+        })
+    except Exception as e:
+        results.put({"error": f"{type(e).__name__}: {e}"})
+
+def measure(corpus, file_types, executor, jobs, repeat):
+    context = multiprocessing.get_context("spawn")
+    runs = []
+    for _ in range(repeat):
+        results = context.Queue()
+        process = context.Process(target=run_case, args=(corpus, file_types, executor, jobs, results))
+        process.start()
+        run = results.get()
+        process.join()
+        if "error" in run:
+            return run
+        runs.append(run)
+    case = dict(runs[0])
+    case["seconds"] = statistics.median(run["seconds"] for run in runs)
+    firsts = [run["first_result_seconds"] for run in runs if run["first_result_seconds"] is not None]
+    case["first_result_seconds"] = statistics.median(firsts) if firsts else None
+    case["peak_rss_mb"] = max(run["peak_rss_mb"] for run in runs)
+    case["peak_worker_rss_mb"] = max(run["peak_worker_rss_mb"] for run in runs)
+    seconds = case["seconds"] or 1e-9
+    case["files_per_second"] = case["files"] / seconds
+    case["mb_per_second"] = case["bytes"] / (1024 * 1024) / seconds
+    return case
+
+def expected_matches(manifest, file_types):
+    expected = manifest["expected"]
+    if not file_types:
+        return sum(expected.values())
+    return sum(expected.get(file_type, 0) for file_type in file_types)
+
+def compare(report, baseline, threshold):
+    regressions = []
+    for name, case in report["cases"].items():
+        previous = baseline.get("cases", {}).get(name)
+        if not previous or "error" in case or "error" in previous:
+            continue
+        for metric in HIGHER_IS_BETTER + LOWER_IS_BETTER:
+            old, new = previous.get(metric), case.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            case.setdefault("change", {})[metric] = round(change, 4)
+            worse = change < -threshold if metric in HIGHER_IS_BETTER else change > threshold
+            if worse:
+                regressions.append(f"{name}: {metric} {old:.3f} -> {new:.3f} ({change:+.1%})")
+    return regressions
+
+def print_report(report):
+    print(f"{'case':<18}{'files':>7}{'MB':>9}{'files/s':>10}{'MB/s':>9}{'first(s)':>10}{'RSS MB':>9}{'worker MB':>11}  matches")
+    for name, case in report["cases"].items():
+        if "error" in case:
+            print(f"{name:<18}{case['error']}")
+            continue
+        first = case["first_result_seconds"]
+        print(
+            f"{name:<18}{case['files']:>7}{case['bytes'] / (1024 * 1024):>9.1f}{case['files_per_second']:>10.1f}"
+            f"{case['mb_per_second']:>9.1f}{'-' if first is None else f'{first:.3f}':>10}{case['peak_rss_mb']:>9.1f}{case['peak_worker_rss_mb']:>11.1f}"
+            f"  {case['matches']}/{case['expected']}"
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the searcher and each handler on a synthetic corpus.")
+    parser.add_argument("--corpus", help="Directory of the synthetic corpus (generated on first use).")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the corpus generator.")
+    parser.add_argument("--scale", type=int, default=1, help="Multiply the number of generated files.")
+    parser.add_argument("--regenerate", action="store_true", help="Regenerate the corpus even if it already exists.")
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES), help="Benchmarks to run.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case; the median time is reported.")
+    parser.add_argument("--executor", choices=["threads", "processes", "hybrid"], default="hybrid")
+    parser.add_argument("--jobs", type=int)
+    parser.add_argument("--output", help="Write the JSON report to this file.")
+    parser.add_argument("--baseline", help="Compare against this JSON report and exit non-zero on regressions.")
+    parser.add_argument("--save-baseline", help="Also write the JSON report to this baseline file.")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative change that counts as a regression.")
+    args = parser.parse_args()
+
+    corpus = args.corpus or os.path.join(tempfile.gettempdir(), f"fcf-benchmark-{args.seed}-{args.scale}")
+    manifest = prepare_corpus(corpus, args.seed, args.scale, args.regenerate)
+    for skipped in manifest["skipped"]:
+        print(f"Not generated: {skipped}")
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "seed": args.seed,
+            "scale": args.scale,
+            "executor": args.executor,
+            "jobs": args.jobs,
+            "repeat": args.repeat,
+        },
+        "cases": {},
+    }
+    for name in args.cases:
+        case = measure(corpus, CASES[name], args.executor, args.jobs, args.repeat)
+        if case.get("files") == 0:
+            continue
+        case["expected"] = expected_matches(manifest, CASES[name])
+        report["cases"][name] = case
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(report, json.load(file), args.threshold)
+
+    print_report(report)
+    for output in (args.output, args.save_baseline):
+        if output:
+            with open(output, "w") as file:
+                json.dump(report, file, indent=4)
+    if regressions:
+        print("Regressions against the baseline:")
+        for regression in regressions:
+            print(f"  {regression}")
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
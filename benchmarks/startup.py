@@ -0,0 +1,118 @@
+# startup.py
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("PyPDF2", "PIL", "pytesseract", "docx", "pptx", "xlrd", "mutagen")
+NEEDLE = "needle"
+
+def prepare_corpus(corpus):
+    os.makedirs(corpus, exist_ok=True)
+    for number in range(10):
+        with open(os.path.join(corpus, f"file{number}.txt"), "w") as file:
+            file.write(f"line {number}\n" * 50 + f"the {NEEDLE} is here\n")
+
+def command(corpus, file_types):
+    cmd = [sys.executable, "-X", "importtime", os.path.join(ROOT, "main.py"), NEEDLE, "-p", corpus, "--no-cache"]
+    if file_types:
+        cmd += ["-t", *file_types]
+    return cmd
+
+def imported_modules(stderr):
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        name = fields[2].strip()
+        modules[name] = (int(fields[1]) / 1e6, len(fields[2]) - len(fields[2].lstrip()) == 1)
+    return modules
+
+def run_once(corpus, file_types):
+    start = time.perf_counter()
+    process = subprocess.run(command(corpus, file_types), cwd=ROOT, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if process.returncode != 0:
+        raise RuntimeError(process.stderr.strip().splitlines()[-1] if process.stderr.strip() else f"exit status {process.returncode}")
+    return elapsed, process.stdout.count(NEEDLE), imported_modules(process.stderr)
+
+def measure(corpus, file_types, repeat):
+    runs = [run_once(corpus, file_types) for _ in range(repeat)]
+    modules = runs[-1][2]
+    heavy = sorted(name for name in modules if name in HEAVY_MODULES)
+    slowest = sorted(((name, seconds) for name, (seconds, top) in modules.items() if top), key=lambda item: item[1], reverse=True)[:10]
+    return {
+        "seconds": statistics.median(run[0] for run in runs),
+        "matches": runs[-1][1],
+        "modules": len(modules),
+        "import_seconds": sum(seconds for seconds, top in modules.values() if top),
+        "heavy_modules": heavy,
+        "slowest_imports": [[name, round(seconds, 4)] for name, seconds in slowest],
+    }
+
+def compare(report, baseline, threshold):
+    regressions = []
+    for metric in ("seconds", "import_seconds"):
+        old, new = baseline.get(metric), report.get(metric)
+        if not old or new is None:
+            continue
+        change = (new - old) / old
+        report.setdefault("change", {})[metric] = round(change, 4)
+        if change > threshold:
+            regressions.append(f"{metric} {old:.3f} -> {new:.3f} ({change:+.1%})")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the startup time of a plain text search on a tiny corpus.")
+    parser.add_argument("--corpus", help="Directory of the text corpus (generated on first use).")
+    parser.add_argument("--types", nargs="*", default=["*.txt"], help="File types passed to -t; empty searches all files.")
+    parser.add_argument("--repeat", type=int, default=10, help="Runs in fresh processes; the median time is reported.")
+    parser.add_argument("--output", help="Write the JSON report to this file.")
+    parser.add_argument("--baseline", help="Compare against this JSON report and exit non-zero on regressions.")
+    parser.add_argument("--save-baseline", help="Also write the JSON report to this baseline file.")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative change that counts as a regression.")
+    args = parser.parse_args()
+
+    corpus = args.corpus or os.path.join(tempfile.gettempdir(), "fcf-startup")
+    prepare_corpus(corpus)
+    report = measure(corpus, args.types, args.repeat)
+    report["meta"] = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "types": args.types,
+        "repeat": args.repeat,
+    }
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(report, json.load(file), args.threshold)
+    if report["heavy_modules"]:
+        regressions.append(f"handler dependencies imported for a text search: {', '.join(report['heavy_modules'])}")
+
+    print(f"startup {report['seconds']:.3f}s (median of {args.repeat}), {report['modules']} modules imported in {report['import_seconds']:.3f}s, {report['matches']} matches")
+    print("slowest imports:")
+    for name, seconds in report["slowest_imports"]:
+        print(f"  {name:<40}{seconds:>8.4f}s")
+    for output in (args.output, args.save_baseline):
+        if output:
+            with open(output, "w") as file:
+                json.dump(report, file, indent=4)
+    if regressions:
+        print("Regressions:")
+        for regression in regressions:
+            print(f"  {regression}")
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
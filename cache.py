@@ -0,0 +1,140 @@
+# cache.py
+import os
+import sqlite3
+import threading
+import time
+
+SHARED_CACHES = {}
+SHARED_LOCK = threading.Lock()
+
+def shared_cache(path, max_size):
+    key = (os.getpid(), path, max_size)
+    with SHARED_LOCK:
+        if key not in SHARED_CACHES:
+            SHARED_CACHES[key] = ContentCache(path, max_size)
+        return SHARED_CACHES[key]
+
+class ContentCache:
+    DEFAULT_MAX_SIZE = 1024 * 1024 * 1024
+    PRUNE_INTERVAL = 256
+
+    def __init__(self, path=None, max_size=DEFAULT_MAX_SIZE):
+        self.path = path or self.default_path()
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.connection = None
+        self.writes = 0
+
+    @staticmethod
+    def default_path():
+        cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+        return os.path.join(cache_home, 'file-content-finder', 'content.sqlite')
+
+    def __reduce__(self):
+        return shared_cache, (self.path, self.max_size)
+
+    def connect(self):
+        if self.connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS content ("
+                "path TEXT NOT NULL, handler TEXT NOT NULL, version INTEGER NOT NULL, "
+                "size INTEGER NOT NULL, mtime INTEGER NOT NULL, inode INTEGER NOT NULL, "
+                "text TEXT NOT NULL, length INTEGER NOT NULL, accessed REAL NOT NULL, "
+                "PRIMARY KEY (path, handler))"
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS content_accessed ON content (accessed)")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS sniffs ("
+                "path TEXT PRIMARY KEY, version INTEGER NOT NULL, size INTEGER NOT NULL, "
+                "mtime INTEGER NOT NULL, inode INTEGER NOT NULL, kind TEXT NOT NULL)"
+            )
+        return self.connection
+
+    def get(self, file_path, handler, version, stat):
+        with self.lock:
+            connection = self.connect()
+            row = connection.execute(
+                "SELECT text FROM content WHERE path = ? AND handler = ? AND version = ? AND size = ? AND mtime = ? AND inode = ?",
+                (file_path, handler, version, stat.st_size, stat.st_mtime_ns, stat.st_ino)
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute(
+                "UPDATE content SET accessed = ? WHERE path = ? AND handler = ?",
+                (time.time(), file_path, handler)
+            )
+            return row[0]
+
+    def put(self, file_path, handler, version, stat, text):
+        with self.lock:
+            connection = self.connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO content (path, handler, version, size, mtime, inode, text, length, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (file_path, handler, version, stat.st_size, stat.st_mtime_ns, stat.st_ino, text, len(text), time.time())
+            )
+            self.writes += 1
+            if self.writes % self.PRUNE_INTERVAL == 0:
+                self.evict(self.max_size)
+
+    def get_sniff(self, file_path, version, stat):
+        with self.lock:
+            row = self.connect().execute(
+                "SELECT kind FROM sniffs WHERE path = ? AND version = ? AND size = ? AND mtime = ? AND inode = ?",
+                (file_path, version, stat.st_size, stat.st_mtime_ns, stat.st_ino)
+            ).fetchone()
+            return row[0] if row else None
+
+    def put_sniff(self, file_path, version, stat, kind):
+        with self.lock:
+            self.connect().execute(
+                "INSERT OR REPLACE INTO sniffs (path, version, size, mtime, inode, kind) VALUES (?, ?, ?, ?, ?, ?)",
+                (file_path, version, stat.st_size, stat.st_mtime_ns, stat.st_ino, kind)
+            )
+
+    def prune(self, max_size=None):
+        with self.lock:
+            self.connect()
+            removed = self.remove_missing()
+            removed += self.evict(self.max_size if max_size is None else max_size)
+            self.connection.execute("VACUUM")
+            return removed
+
+    def remove_missing(self):
+        stale = []
+        for path, handler, size, mtime, inode in self.connection.execute("SELECT path, handler, size, mtime, inode FROM content"):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                stale.append((path, handler))
+                continue
+            if (stat.st_size, stat.st_mtime_ns, stat.st_ino) != (size, mtime, inode):
+                stale.append((path, handler))
+        self.connection.executemany("DELETE FROM content WHERE path = ? AND handler = ?", stale)
+        missing = [(path,) for path, in self.connection.execute("SELECT path FROM sniffs") if not os.path.exists(path)]
+        self.connection.executemany("DELETE FROM sniffs WHERE path = ?", missing)
+        return len(stale) + len(missing)
+
+    def evict(self, max_size):
+        total = self.connection.execute("SELECT COALESCE(SUM(length), 0) FROM content").fetchone()[0]
+        victims = []
+        if total > max_size:
+            for path, handler, length in self.connection.execute("SELECT path, handler, length FROM content ORDER BY accessed"):
+                if total <= max_size:
+                    break
+                victims.append((path, handler))
+                total -= length
+        self.connection.executemany("DELETE FROM content WHERE path = ? AND handler = ?", victims)
+        return len(victims)
+
+    def close(self):
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
@@ -0,0 +1,71 @@
+# client.py
+import json
+import os
+import socket
+import sys
+from models import FileResult
+from output import print_results
+
+def default_socket_path():
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return os.path.join(runtime_dir, 'file-content-finder.sock')
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(cache_home, 'file-content-finder', 'daemon.sock')
+
+def split_socket_option(argv):
+    socket_path = os.environ.get('FCF_SOCKET') or default_socket_path()
+    rest = []
+    arguments = iter(argv)
+    for argument in arguments:
+        if argument == "--socket":
+            socket_path = next(arguments, socket_path)
+        elif argument.startswith("--socket="):
+            socket_path = argument.split("=", 1)[1]
+        else:
+            rest.append(argument)
+    return socket_path, rest
+
+def connect(socket_path, argv):
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(socket_path)
+        connection.sendall(json.dumps({"argv": argv, "cwd": os.getcwd()}).encode() + b"\n")
+    except OSError:
+        connection.close()
+        raise
+    return connection
+
+def read_results(messages, footer):
+    for message in messages:
+        if "result" not in message:
+            footer.update(message)
+            return
+        yield FileResult.from_dict(message["result"])
+
+def main(argv):
+    socket_path, argv = split_socket_option(argv)
+    try:
+        connection = connect(socket_path, argv)
+    except OSError as e:
+        print(f"Cannot reach the search daemon at {socket_path}: {e}", file=sys.stderr)
+        raise SystemExit(2)
+    with connection, connection.makefile("r", encoding="utf-8") as stream:
+        messages = (json.loads(line) for line in stream)
+        header = next(messages, {"output": "The search daemon closed the connection.\n", "exit": 1})
+        if "mode" not in header:
+            print(header.get("output", ""), end="", file=sys.stdout if header.get("exit") == 0 else sys.stderr)
+            raise SystemExit(header.get("exit", 1))
+        footer = {}
+        print_results(read_results(messages, footer), header["mode"])
+        if "error" in footer or "done" not in footer:
+            print(footer.get("error", "The search daemon closed the connection."), file=sys.stderr)
+            raise SystemExit(1)
+        if footer.get("stats"):
+            print(footer["stats"], file=sys.stderr)
+
+if __name__ == "__main__":
+    try:
+        main(sys.argv[1:])
+    except KeyboardInterrupt:
+        raise SystemExit(130)
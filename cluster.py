@@ -0,0 +1,541 @@
+# cluster.py
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import shutil
+import signal
+import socket
+import socketserver
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from collections import Counter, deque
+from concurrent.futures import BrokenExecutor
+from cache import ContentCache
+from daemon import RequestError, RequestParser
+from engine import ENGINE
+from main import build_parser, create_searcher, validate_patterns
+from models import FileResult
+from scanner import Scanner
+from scheduler import shutdown_pools
+
+def parse_address(address):
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[len("unix:"):]
+    if "/" in address:
+        return socket.AF_UNIX, address
+    host, _, port = address.rpartition(":")
+    return socket.AF_INET, (host or "127.0.0.1", int(port))
+
+def connect(address, timeout=None):
+    family, target = parse_address(address)
+    if family == socket.AF_INET:
+        return socket.create_connection(target, timeout)
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    connection.settimeout(timeout)
+    try:
+        connection.connect(target)
+    except OSError:
+        connection.close()
+        raise
+    return connection
+
+class ShardWorker:
+    HEARTBEAT = 10
+    def __init__(self, address, roots, cache=None, executor="hybrid", jobs=None, verbose=False):
+        self.address = address
+        self.roots = [os.path.realpath(root).rstrip('/') + '/' for root in roots]
+        self.cache = cache
+        self.executor = executor
+        self.jobs = jobs
+        self.verbose = verbose
+        self.pools = {}
+        self.server = None
+
+    def verbose_print(self, *messages):
+        if self.verbose:
+            print(" ".join(messages), flush=True)
+
+    def start(self):
+        family, target = parse_address(self.address)
+        handler = self.handler_class()
+        if family == socket.AF_UNIX:
+            if os.path.exists(target):
+                os.unlink(target)
+            self.server = socketserver.ThreadingUnixStreamServer(target, handler)
+        else:
+            socketserver.ThreadingTCPServer.allow_reuse_address = True
+            self.server = socketserver.ThreadingTCPServer(target, handler)
+        self.server.daemon_threads = True
+        self.verbose_print(f"Worker listening on {self.address}.")
+
+    def handler_class(self):
+        worker = self
+
+        class RequestHandler(socketserver.StreamRequestHandler):
+            def handle(self):
+                try:
+                    worker.serve(self.rfile, self.wfile)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+        return RequestHandler
+
+    def serve_forever(self):
+        try:
+            self.server.serve_forever()
+        finally:
+            self.close()
+
+    def shutdown(self):
+        threading.Thread(target=self.server.shutdown, daemon=True).start()
+
+    def close(self):
+        self.server.server_close()
+        family, target = parse_address(self.address)
+        if family == socket.AF_UNIX:
+            try:
+                os.unlink(target)
+            except OSError:
+                pass
+        shutdown_pools(self.pools)
+        if self.cache is not None:
+            self.cache.close()
+
+    def parse(self, argv):
+        parser = build_parser(RequestParser)
+        args = parser.parse_args(argv)
+        validate_patterns(parser, args)
+        args.jobs = self.jobs
+        if args.executor == parser.get_default("executor"):
+            args.executor = self.executor
+        return args
+
+    def serve(self, rfile, wfile):
+        lock = threading.Lock()
+
+        def send(message):
+            with lock:
+                wfile.write(json.dumps(message).encode() + b"\n")
+
+        line = rfile.readline()
+        if not line:
+            return
+        try:
+            args = self.parse(json.loads(line)["argv"])
+        except RequestError as e:
+            send({"output": e.message, "exit": e.status})
+            return
+        except (ValueError, KeyError, TypeError) as e:
+            send({"output": f"Invalid request: {e}\n", "exit": 2})
+            return
+        searcher = create_searcher(args, [], self.cache, pools=self.pools)
+        send({"ready": True})
+        stop = threading.Event()
+        threading.Thread(target=self.heartbeat, args=(send, stop), daemon=True).start()
+        try:
+            for line in rfile:
+                self.search_shard(searcher, json.loads(line), send)
+        finally:
+            stop.set()
+
+    def heartbeat(self, send, stop):
+        while not stop.wait(self.HEARTBEAT):
+            try:
+                send({"heartbeat": True})
+            except OSError:
+                return
+
+    def allowed(self, file_path):
+        real_path = os.path.realpath(file_path).rstrip('/') + '/'
+        return any(real_path.startswith(root) for root in self.roots)
+
+    def search_shard(self, searcher, shard, send):
+        self.verbose_print(f"Searching shard {shard['shard']}...")
+        paths = [file_path for file_path, _ in shard["items"]] if "items" in shard else shard["paths"]
+        outside = next((file_path for file_path in paths if not self.allowed(file_path)), None)
+        if outside is not None:
+            send({"error": f"{outside} is outside the roots of worker {self.address}", "shard": shard["shard"]})
+            return
+        try:
+            if "items" in shard:
+                items = ((file_path, file_type) for file_path, file_type in shard["items"])
+                items = searcher.route(items) if searcher.sniff and not shard.get("routed") else items
+            else:
+                searcher.setSearchPaths(shard["paths"])
+                items = searcher.scan()
+            results = searcher.search_items(items)
+            try:
+                for result in results:
+                    send({"result": result.to_dict()})
+            finally:
+                results.close()
+        except (BrokenPipeError, ConnectionResetError):
+            raise
+        except BrokenExecutor as e:
+            self.verbose_print(f"Restarting the worker pools: {e}")
+            shutdown_pools(self.pools)
+            raise ConnectionResetError(str(e))
+        except Exception as e:
+            send({"error": str(e), "shard": shard["shard"]})
+            return
+        send({"done": shard["shard"]})
+
+class Shard:
+    __slots__ = ("id", "items", "paths", "routed", "attempts", "emitted")
+
+    def __init__(self, id, items=None, paths=None, routed=False):
+        self.id = id
+        self.items = items
+        self.paths = paths
+        self.routed = routed
+        self.attempts = 0
+        self.emitted = Counter()
+
+    def to_dict(self):
+        if self.items is not None:
+            return {"shard": self.id, "items": self.items, "routed": self.routed}
+        return {"shard": self.id, "paths": self.paths}
+
+class ShardError(Exception):
+    pass
+
+class Coordinator:
+    SHARD_SIZE = 512
+    SHARDS_PER_WORKER = 4
+    MAX_ATTEMPTS = 3
+    CONNECT_TIMEOUT = 10
+    DEFAULT_TIMEOUT = 60
+    RESULT_BUFFER = 256
+
+    def __init__(self, addresses, argv, searcher, shard_by="hash", timeout=None):
+        self.addresses = list(addresses)
+        self.argv = argv
+        self.searcher = searcher
+        self.shard_by = shard_by
+        self.timeout = timeout or self.DEFAULT_TIMEOUT
+        self.condition = threading.Condition()
+        self.queues = [deque() for _ in self.addresses]
+        self.alive = [True] * len(self.addresses)
+        self.producing = True
+        self.pending = 0
+        self.finished = False
+        self.shard_ids = 0
+        self.results = queue.Queue(self.RESULT_BUFFER)
+        self.stop = threading.Event()
+        self.done = object()
+        self.connections = []
+
+    def verbose_print(self, *messages):
+        self.searcher.verbose_print(*messages)
+
+    def search(self, items=None):
+        if not self.addresses:
+            raise ValueError("No workers to distribute the search over.")
+        threads = [threading.Thread(target=self.produce, args=(items,), name="shard-producer", daemon=True)]
+        threads.extend(threading.Thread(target=self.serve_worker, args=(index,), name=f"shard-worker-{index}", daemon=True) for index in range(len(self.addresses)))
+        for thread in threads:
+            thread.start()
+        found = 0
+        try:
+            while True:
+                message = self.results.get()
+                if message is self.done:
+                    return
+                if isinstance(message, BaseException):
+                    raise message
+                yield message
+                found += 1
+                if self.searcher.max_results is not None and found >= self.searcher.max_results:
+                    return
+        finally:
+            self.stop.set()
+            with self.condition:
+                self.condition.notify_all()
+                connections = list(self.connections)
+            for connection in connections:
+                try:
+                    connection.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+            while True:
+                try:
+                    self.results.get_nowait()
+                except queue.Empty:
+                    break
+            for thread in threads:
+                thread.join(timeout=1)
+
+    def emit(self, message):
+        while not self.stop.is_set():
+            try:
+                self.results.put(message, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def produce(self, items):
+        try:
+            if items is None and self.shard_by == "subtree":
+                for paths in self.subtree_shards():
+                    self.add_shard(self.affinity(paths[0]), Shard(self.next_id(), paths=paths))
+            else:
+                self.hash_shards(items)
+        except Exception as e:
+            self.emit(e)
+        finally:
+            with self.condition:
+                self.producing = False
+                self.check_finished()
+                self.condition.notify_all()
+
+    def next_id(self):
+        self.shard_ids += 1
+        return self.shard_ids
+
+    def affinity(self, file_path):
+        return zlib.crc32(os.fsencode(file_path)) % len(self.addresses)
+
+    def scanner(self):
+        return Scanner(self.searcher.search_paths, self.searcher.file_types, self.searcher.skip_patterns, self.searcher.verbose, untyped=self.searcher.sniff)
+
+    def hash_shards(self, items):
+        routed = items is not None
+        if items is None:
+            items = self.scanner().scan()
+        buckets = [[] for _ in self.addresses]
+        for file_path, file_type in items:
+            if self.stop.is_set():
+                return
+            index = self.affinity(file_path)
+            buckets[index].append([file_path, file_type])
+            if len(buckets[index]) >= self.SHARD_SIZE:
+                self.add_shard(index, Shard(self.next_id(), items=buckets[index], routed=routed))
+                buckets[index] = []
+        for index, bucket in enumerate(buckets):
+            if bucket:
+                self.add_shard(index, Shard(self.next_id(), items=bucket, routed=routed))
+
+    def subtree_shards(self):
+        scanner = self.scanner()
+        target = len(self.addresses) * self.SHARDS_PER_WORKER
+        directories = deque()
+        files = []
+        for search_path in self.searcher.search_paths:
+            if os.path.isdir(search_path):
+                directories.append(search_path.rstrip('/') or '/')
+            else:
+                files.append(search_path.rstrip('/'))
+        while directories and len(directories) + len(files) // self.SHARD_SIZE < target:
+            directory = directories.popleft()
+            for entry in scanner.list_entries(directory):
+                if entry.is_dir(follow_symlinks=False):
+                    directories.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    files.append(entry.path)
+        for start in range(0, len(files), self.SHARD_SIZE):
+            yield files[start:start + self.SHARD_SIZE]
+        for directory in directories:
+            yield [directory]
+
+    def add_shard(self, index, shard):
+        with self.condition:
+            self.queues[index].append(shard)
+            self.pending += 1
+            self.condition.notify_all()
+
+    def next_shard(self, index):
+        with self.condition:
+            while not self.stop.is_set() and not self.finished:
+                if self.queues[index]:
+                    return self.queues[index].popleft()
+                longest = max(range(len(self.queues)), key=lambda other: (not self.alive[other], len(self.queues[other])))
+                if self.queues[longest]:
+                    return self.queues[longest].pop()
+                if not self.producing and not self.pending:
+                    return None
+                self.condition.wait(0.5)
+            return None
+
+    def check_finished(self):
+        if not self.producing and not self.pending and not self.finished:
+            self.finished = True
+            self.emit(self.done)
+
+    def serve_worker(self, index):
+        address = self.addresses[index]
+        try:
+            connection = self.handshake(address)
+        except ShardError as e:
+            self.emit(e)
+            return
+        except (OSError, ValueError) as e:
+            self.fail_worker(index, e)
+            return
+        with self.condition:
+            self.connections.append(connection)
+        with connection, connection.makefile("rb") as stream:
+            while True:
+                shard = self.next_shard(index)
+                if shard is None:
+                    return
+                try:
+                    self.run_shard(connection, stream, shard)
+                except ShardError as e:
+                    self.emit(e)
+                    return
+                except (OSError, ValueError) as e:
+                    self.fail_worker(index, e, shard)
+                    return
+                with self.condition:
+                    self.pending -= 1
+                    self.check_finished()
+                    self.condition.notify_all()
+
+    def handshake(self, address):
+        connection = connect(address, self.CONNECT_TIMEOUT)
+        try:
+            connection.sendall(json.dumps({"argv": self.argv}).encode() + b"\n")
+            with connection.makefile("rb") as stream:
+                reply = json.loads(stream.readline() or b"null")
+            if reply is None:
+                raise ConnectionError("the worker closed the connection")
+            if not reply.get("ready"):
+                raise ShardError(f"Worker {address} rejected the search: {reply.get('output', '').strip()}")
+            connection.settimeout(self.timeout)
+        except BaseException:
+            connection.close()
+            raise
+        return connection
+
+    def run_shard(self, connection, stream, shard):
+        replayed = Counter(shard.emitted)
+        connection.sendall(json.dumps(shard.to_dict()).encode() + b"\n")
+        for line in stream:
+            message = json.loads(line)
+            if "result" in message:
+                key = json.dumps(message["result"], sort_keys=True)
+                if replayed[key]:
+                    replayed[key] -= 1
+                    continue
+                shard.emitted[key] += 1
+                self.emit(FileResult.from_dict(message["result"]))
+            elif message.get("done") == shard.id:
+                return
+            elif "error" in message:
+                raise ShardError(message["error"])
+        raise ConnectionError("the worker closed the connection")
+
+    def fail_worker(self, index, error, shard=None):
+        with self.condition:
+            self.alive[index] = False
+            self.verbose_print(f"Worker {self.addresses[index]} failed: {error}")
+            if shard is not None:
+                shard.attempts += 1
+                if shard.attempts >= self.MAX_ATTEMPTS:
+                    self.emit(RuntimeError(f"Shard {shard.id} failed on {shard.attempts} workers, last error: {error}"))
+                    return
+                self.verbose_print(f"Re-queuing shard {shard.id}.")
+                self.queues[index].appendleft(shard)
+            if not any(self.alive):
+                self.emit(RuntimeError(f"All workers failed, last error: {error}"))
+            self.condition.notify_all()
+
+class LocalWorkers:
+    STARTUP_TIMEOUT = 30
+
+    def __init__(self, count, cache_dir=None, no_cache=False, jobs=None, verbose=False):
+        self.count = count
+        self.arguments = ["--cache-dir", cache_dir] if cache_dir else []
+        if no_cache:
+            self.arguments.append("--no-cache")
+        if jobs:
+            self.arguments.extend(["--jobs", str(jobs)])
+        if verbose:
+            self.arguments.append("-v")
+        self.directory = None
+        self.processes = []
+        self.addresses = []
+
+    def __enter__(self):
+        if not self.count:
+            return self
+        self.directory = tempfile.mkdtemp(prefix="fcf-workers-")
+        try:
+            for number in range(self.count):
+                address = f"unix:{os.path.join(self.directory, f'worker-{number}.sock')}"
+                self.processes.append(subprocess.Popen([sys.executable, os.path.abspath(__file__), "--listen", address, "--root", "/", *self.arguments]))
+                self.addresses.append(address)
+            self.wait()
+        except BaseException:
+            self.__exit__(None, None, None)
+            raise
+        return self
+
+    def wait(self):
+        deadline = time.monotonic() + self.STARTUP_TIMEOUT
+        for process, address in zip(self.processes, self.addresses):
+            while True:
+                try:
+                    connect(address, 1).close()
+                    break
+                except OSError:
+                    if process.poll() is not None:
+                        raise RuntimeError(f"Local worker {address} exited with status {process.returncode}")
+                    if time.monotonic() > deadline:
+                        raise RuntimeError(f"Local worker {address} did not start in time")
+                    time.sleep(0.05)
+
+    def __exit__(self, exc_type, exc, traceback):
+        for process in self.processes:
+            if process.poll() is None:
+                process.terminate()
+        for process in self.processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+        if self.directory:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+def search_cluster(args, argv, searcher, items=None):
+    with LocalWorkers(args.local_workers, args.cache_dir, args.no_cache, args.jobs, args.verbose) as local_workers:
+        addresses = list(args.workers or []) + local_workers.addresses
+        yield from Coordinator(addresses, argv, searcher, args.shard_by, args.worker_timeout).search(items)
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a search worker that executes shards handed out by a coordinator (main.py --workers).")
+    parser.add_argument("--listen", required=True, help="Address to listen on: host:port for TCP or unix:/path for a Unix socket.")
+    parser.add_argument("--root", nargs="+", required=True, help="Directories the worker may search; shards with paths outside them are rejected.")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Print the shards being searched.")
+    parser.add_argument("-e", "--executor", choices=["threads", "processes", "hybrid"], default="hybrid", help="Default executor of searches that do not pass -e.")
+    parser.add_argument("--jobs", type=int, help="Size of the worker pools (defaults to the number of CPUs).")
+    parser.add_argument("--tool-concurrency", type=int, default=ENGINE.DEFAULT_CONCURRENCY, help="Maximum number of external tool processes running at the same time.")
+    parser.add_argument("--cache-dir", help="Directory of the extracted-text cache (defaults to ~/.cache/file-content-finder).")
+    parser.add_argument("--cache-size", type=int, default=ContentCache.DEFAULT_MAX_SIZE // (1024 * 1024), help="Maximum size of the extracted-text cache in MiB.")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read from or write to the extracted-text cache.")
+    args = parser.parse_args()
+    multiprocessing.set_start_method("forkserver")
+
+    cache = None
+    if not args.no_cache:
+        cache_path = os.path.join(args.cache_dir, 'content.sqlite') if args.cache_dir else None
+        cache = ContentCache(cache_path, args.cache_size * 1024 * 1024)
+    ENGINE.configure(args.tool_concurrency)
+
+    worker = ShardWorker(args.listen, args.root, cache, args.executor, args.jobs, args.verbose)
+    worker.start()
+    signal.signal(signal.SIGTERM, lambda signum, frame: worker.shutdown())
+    try:
+        worker.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
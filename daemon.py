@@ -0,0 +1,388 @@
+# daemon.py
+import argparse
+import json
+import os
+import queue
+import signal
+import socket
+import socketserver
+import sys
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from cache import ContentCache
+from client import default_socket_path
+from engine import ENGINE
+from index import ContentIndex
+from main import build_parser, create_searcher, validate_patterns
+from output import output_mode
+from scanner import Scanner
+from scheduler import shutdown_pools
+from searcher import Searcher
+from sniffer import Sniffer
+from stats import SearchStats
+from watcher import create_watcher
+
+DAEMON_OPTIONS = ("cache_dir", "cache_size", "no_cache", "prune_cache", "index_build", "index_update", "index_file", "jobs", "tool_concurrency", "profile")
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+class RequestParser(argparse.ArgumentParser):
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("prog", "client.py")
+        super().__init__(*args, **kwargs)
+        self.messages = []
+
+    def _print_message(self, message, file=None):
+        if message:
+            self.messages.append(message)
+
+    def exit(self, status=0, message=None):
+        if message:
+            self.messages.append(message)
+        raise RequestError(status, "".join(self.messages))
+
+class FileTable:
+    SNIFF_BATCH = 256
+
+    def __init__(self, roots, cache=None, verbose=False, jobs=None):
+        self.roots = roots
+        self.sniffer = Sniffer(cache)
+        self.verbose = verbose
+        self.jobs = jobs
+        self.files = {}
+        self.lock = threading.Lock()
+
+    def verbose_print(self, *messages):
+        if self.verbose:
+            print(" ".join(messages))
+
+    def load(self):
+        scanner = Scanner(self.roots, [], [], self.verbose, untyped=True)
+        paths = [file_path for file_path, _ in scanner.scan()]
+        files = self.sniff(paths)
+        with self.lock:
+            self.files = files
+        self.verbose_print(f"Watching {len(files)} files below {', '.join(self.roots)}.")
+
+    def sniff(self, paths):
+        files = {}
+        with ThreadPoolExecutor(max_workers=self.jobs or min(32, (os.cpu_count() or 1) + 4)) as executor:
+            for start in range(0, len(paths), self.SNIFF_BATCH):
+                batch = paths[start:start + self.SNIFF_BATCH]
+                files.update(zip(batch, executor.map(self.sniff_file, batch)))
+        return files
+
+    def sniff_file(self, file_path):
+        try:
+            return self.sniffer.sniff(file_path)
+        except OSError as e:
+            self.verbose_print(f"Could not sniff {file_path}: {e}")
+            return None
+
+    def covers(self, search_path):
+        return any(search_path.startswith(root) for root in self.roots)
+
+    def update(self, changed, removed):
+        with self.lock:
+            for path in removed:
+                prefix = path.rstrip('/') + '/'
+                self.files.pop(path, None)
+                for file_path in [file_path for file_path in self.files if file_path.startswith(prefix)]:
+                    del self.files[file_path]
+        changed = [path for path in changed if self.covers(path) and os.path.isfile(path) and not os.path.islink(path)]
+        files = self.sniff(changed)
+        with self.lock:
+            self.files.update(files)
+        return changed
+
+    def entries(self, paths=None):
+        with self.lock:
+            if paths is None:
+                return list(self.files.items())
+            return [(path, self.files[path]) for path in paths if path in self.files]
+
+class SearchDaemon:
+    def __init__(self, roots, socket_path=None, cache=None, index_path=None, executor="hybrid", jobs=None, verbose=False):
+        self.roots = [os.path.abspath(root).rstrip('/') + '/' for root in roots]
+        self.socket_path = socket_path or default_socket_path()
+        self.cache = cache
+        self.index_path = index_path
+        self.executor = executor
+        self.jobs = jobs
+        self.verbose = verbose
+        self.table = FileTable(self.roots, cache, verbose, jobs)
+        self.pools = {}
+        self.indexer = Searcher([], [], self.roots, verbose, True, [], False, False, False, cache=cache, executor=executor, jobs=jobs, pools=self.pools)
+        self.index_ready = threading.Event()
+        self.index_queue = queue.Queue()
+        self.index_pending = Counter()
+        self.pending_lock = threading.Lock()
+        self.loaded = threading.Event()
+        self.watcher = None
+        self.server = None
+
+    @staticmethod
+    def default_index_path():
+        return os.path.join(os.path.dirname(ContentIndex.default_path()), 'daemon.sqlite')
+
+    def verbose_print(self, *messages):
+        if self.verbose:
+            print(" ".join(messages), flush=True)
+
+    def start(self):
+        self.watcher = create_watcher(self.roots, self.refresh, self.verbose)
+        self.watcher.start()
+        self.table.load()
+        self.loaded.set()
+        if self.index_path:
+            threading.Thread(target=self.run_indexer, name="indexer", daemon=True).start()
+            self.index_queue.put((None, None))
+        self.server = socketserver.ThreadingUnixStreamServer(self.bind(), self.handler_class(), bind_and_activate=False)
+        self.server.daemon_threads = True
+        previous = os.umask(0o077)
+        try:
+            self.server.server_bind()
+        finally:
+            os.umask(previous)
+        self.server.server_activate()
+        self.verbose_print(f"Listening on {self.socket_path}.")
+
+    def bind(self):
+        directory = os.path.dirname(self.socket_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self.socket_path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.socket_path)
+            except OSError:
+                os.unlink(self.socket_path)
+            else:
+                raise OSError(f"Another daemon is already listening on {self.socket_path}")
+            finally:
+                probe.close()
+        return self.socket_path
+
+    def handler_class(self):
+        daemon = self
+
+        class RequestHandler(socketserver.StreamRequestHandler):
+            def handle(self):
+                daemon.handle(self.rfile, self.wfile)
+
+        return RequestHandler
+
+    def serve_forever(self):
+        try:
+            self.server.serve_forever()
+        finally:
+            self.close()
+
+    def shutdown(self):
+        threading.Thread(target=self.server.shutdown, daemon=True).start()
+
+    def close(self):
+        if self.watcher is not None:
+            self.watcher.stop()
+        self.index_queue.put(None)
+        self.server.server_close()
+        try:
+            os.unlink(self.socket_path)
+        except OSError:
+            pass
+        shutdown_pools(self.pools)
+        if self.cache is not None:
+            self.cache.close()
+
+    def refresh(self, changed, removed, rescan=False):
+        self.loaded.wait()
+        if rescan:
+            self.verbose_print("Too many changes at once, rescanning all files.")
+            self.table.load()
+            if self.index_path:
+                self.index_ready.clear()
+                self.index_queue.put((None, None))
+            return
+        if self.index_path:
+            with self.pending_lock:
+                self.index_pending.update(changed)
+        refreshed = self.table.update(changed, removed)
+        self.verbose_print(f"Refreshed {len(refreshed)} changed and {len(removed)} removed paths.")
+        if self.index_path:
+            self.index_queue.put((changed, removed))
+
+    def run_indexer(self):
+        index = ContentIndex(self.index_path, self.indexer)
+        try:
+            while True:
+                task = self.index_queue.get()
+                if task is None:
+                    return
+                changed, removed = task
+                try:
+                    if changed is None:
+                        added, updated, deleted = index.update()
+                        self.index_ready.set()
+                    else:
+                        items = self.select(self.indexer, self.table.entries(changed))
+                        added, updated, deleted = index.refresh(items, removed)
+                    self.verbose_print(f"Indexed {added} new and {updated} changed files, removed {deleted} files from {index.path}.")
+                except Exception as e:
+                    self.verbose_print(f"Indexing failed: {e}")
+                finally:
+                    if changed is not None:
+                        with self.pending_lock:
+                            for path in changed:
+                                self.index_pending[path] -= 1
+                                if self.index_pending[path] <= 0:
+                                    del self.index_pending[path]
+        finally:
+            index.close()
+
+    def select(self, searcher, entries):
+        scanner = Scanner(searcher.search_paths, searcher.file_types, searcher.skip_patterns, untyped=searcher.sniff)
+        directories = searcher.search_paths
+        files = [search_path.rstrip('/') for search_path in directories]
+        sniffed = skipped = 0
+        for file_path, kind in entries:
+            if not (file_path in files or any(file_path.startswith(directory) for directory in directories)):
+                continue
+            file_type = scanner.classify(os.path.basename(file_path))
+            if file_type is None:
+                continue
+            if searcher.sniff:
+                sniffed += 1
+                routed = searcher.resolve(file_type, kind)
+                if routed is None:
+                    skipped += 1
+                    continue
+                file_type = routed
+            yield file_path, file_type
+        if searcher.stats is not None:
+            searcher.stats.add_sniff(sniffed, skipped)
+
+    def items(self, searcher, query):
+        if not all(self.table.covers(search_path) for search_path in searcher.search_paths):
+            return searcher.scan(), None
+        if query and self.index_ready.is_set():
+            index = ContentIndex(self.index_path, searcher)
+            with self.pending_lock:
+                pending = list(self.index_pending)
+            paths = [file_path for file_path, _ in index.candidates(searcher.search_strings, check_stale=False)]
+            paths = list(dict.fromkeys(paths + pending))
+            return self.select(searcher, self.table.entries(paths)), index
+        return self.select(searcher, self.table.entries()), None
+
+    def parse(self, argv):
+        parser = build_parser(RequestParser)
+        args = parser.parse_args(argv)
+        if not args.search_strings:
+            parser.error("the following arguments are required: search_strings")
+        validate_patterns(parser, args)
+        for option in DAEMON_OPTIONS:
+            if getattr(args, option) != parser.get_default(option):
+                parser.error(f"--{option.replace('_', '-')} is fixed when the daemon is started")
+        if args.workers or args.local_workers:
+            parser.error("--workers and --local-workers cannot be used through the daemon")
+        args.jobs = self.jobs
+        if args.executor == parser.get_default("executor"):
+            args.executor = self.executor
+        return args
+
+    def handle(self, rfile, wfile):
+        try:
+            self.serve(rfile, wfile)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def serve(self, rfile, wfile):
+        def send(message):
+            wfile.write(json.dumps(message).encode() + b"\n")
+
+        line = rfile.readline()
+        if not line:
+            return
+        try:
+            request = json.loads(line)
+            args = self.parse(request["argv"])
+        except RequestError as e:
+            send({"output": e.message, "exit": e.status})
+            return
+        except (ValueError, KeyError, TypeError) as e:
+            send({"output": f"Invalid request: {e}\n", "exit": 2})
+            return
+
+        cwd = request.get("cwd") or "/"
+        paths = [os.path.normpath(os.path.join(cwd, path)) for path in args.paths or ["."]]
+        stats = None
+        if args.stats or args.stats_json or args.trace:
+            stats = SearchStats(args.slowest, args.trace and os.path.join(cwd, args.trace))
+        searcher = create_searcher(args, paths, self.cache, stats, pools=self.pools)
+        send({"mode": output_mode(args)})
+        index = None
+        try:
+            items, index = self.items(searcher, args.query)
+            results = searcher.search_items(items)
+            try:
+                for result in results:
+                    send({"result": result.to_dict()})
+            finally:
+                results.close()
+            footer = {"done": True}
+            if stats is not None:
+                stats.close()
+                if args.stats:
+                    footer["stats"] = stats.summary()
+                if args.stats_json:
+                    with open(os.path.join(cwd, args.stats_json), "w") as stats_file:
+                        json.dump(stats.to_dict(), stats_file, indent=4)
+            send(footer)
+        except (BrokenPipeError, ConnectionResetError):
+            raise
+        except Exception as e:
+            send({"error": str(e)})
+        finally:
+            if index is not None:
+                index.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep the handler registry, file listing, content types and extracted text warm, watch the given paths for changes and answer searches from client.py over a Unix socket.")
+    parser.add_argument("-p", "--paths", nargs="+", default=["."], help="The paths to watch and serve searches for.")
+    parser.add_argument("--socket", help="Location of the Unix socket (defaults to $XDG_RUNTIME_DIR/file-content-finder.sock).")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Print scanned, refreshed and indexed files.")
+    parser.add_argument("-e", "--executor", choices=["threads", "processes", "hybrid"], default="hybrid", help="Default executor of searches that do not pass -e.")
+    parser.add_argument("--jobs", type=int, help="Size of the shared worker pools (defaults to the number of CPUs).")
+    parser.add_argument("--tool-concurrency", type=int, default=ENGINE.DEFAULT_CONCURRENCY, help="Maximum number of external tool processes running at the same time.")
+    parser.add_argument("--cache-dir", help="Directory of the extracted-text cache (defaults to ~/.cache/file-content-finder).")
+    parser.add_argument("--cache-size", type=int, default=ContentCache.DEFAULT_MAX_SIZE // (1024 * 1024), help="Maximum size of the extracted-text cache in MiB.")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read from or write to the extracted-text cache.")
+    parser.add_argument("--index-file", help="Location of the full-text index kept up to date for -q searches (defaults to ~/.cache/file-content-finder/daemon.sqlite).")
+    parser.add_argument("--no-index", action="store_true", help="Do not maintain a full-text index; -q searches verify every watched file.")
+    args = parser.parse_args()
+
+    cache = None
+    if not args.no_cache:
+        cache_path = os.path.join(args.cache_dir, 'content.sqlite') if args.cache_dir else None
+        cache = ContentCache(cache_path, args.cache_size * 1024 * 1024)
+    ENGINE.configure(args.tool_concurrency)
+
+    index_path = None if args.no_index else args.index_file or SearchDaemon.default_index_path()
+    daemon = SearchDaemon(args.paths, args.socket, cache, index_path, args.executor, args.jobs, args.verbose)
+    try:
+        daemon.start()
+    except OSError as e:
+        print(e, file=sys.stderr)
+        raise SystemExit(1)
+    signal.signal(signal.SIGTERM, lambda signum, frame: daemon.shutdown())
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# engine.py
+import asyncio
+import atexit
+import os
+import signal
+import subprocess
+import threading
+
+class SubprocessEngine:
+    DEFAULT_CONCURRENCY = 64
+
+    def __init__(self, concurrency=None):
+        self.concurrency = concurrency or self.DEFAULT_CONCURRENCY
+        self.loop = None
+        self.thread = None
+        self.semaphore = None
+        self.processes = set()
+        self.pid = None
+        self.lock = threading.Lock()
+
+    def configure(self, concurrency=None):
+        if concurrency:
+            self.concurrency = concurrency
+            self.semaphore = None
+
+    def start(self):
+        with self.lock:
+            if self.loop is None or self.pid != os.getpid():
+                self.pid = os.getpid()
+                self.processes = set()
+                self.semaphore = None
+                self.loop = asyncio.new_event_loop()
+                self.thread = threading.Thread(target=self.loop.run_forever, name="subprocess-engine", daemon=True)
+                self.thread.start()
+            return self.loop
+
+    def submit(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.start())
+
+    def call(self, coroutine):
+        future = self.submit(coroutine)
+        try:
+            return future.result()
+        except BaseException:
+            future.cancel()
+            raise
+
+    async def run(self, cmd, timeout=None, env=None):
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.concurrency)
+        async with self.semaphore:
+            process = await asyncio.create_subprocess_exec(
+                *cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                env=env, start_new_session=True
+            )
+            self.processes.add(process)
+            try:
+                out, err = await asyncio.wait_for(process.communicate(), timeout)
+            except BaseException:
+                self.kill(process)
+                raise
+            finally:
+                self.processes.discard(process)
+            return process.returncode, out, err
+
+    def kill(self, process):
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def shutdown(self):
+        with self.lock:
+            if self.loop is None or self.pid != os.getpid():
+                return
+            loop, self.loop = self.loop, None
+        for process in list(self.processes):
+            self.kill(process)
+        loop.call_soon_threadsafe(self.stop_loop, loop)
+        self.thread.join(timeout=5)
+
+    def stop_loop(self, loop):
+        for task in asyncio.all_tasks(loop):
+            task.cancel()
+        loop.call_later(0.1, loop.stop)
+
+def run_coroutine(process_func, item):
+    return ENGINE.call(process_func(item))
+
+ENGINE = SubprocessEngine()
+atexit.register(ENGINE.shutdown)
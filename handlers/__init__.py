@@ -1,8 +1,23 @@
-from .pdf_handler import PDFHandler
-from .text_handler import TextHandler
-from .image_handler import ImageHandler
-from .xls_handler import XLSHandler
-from .doc_handler import DocHandler
-from .sqlite_handler import SQLiteHandler
-from .odp_handler import ODPHandler
-from .metadata_handler import MetadataHandler
+import importlib
+
+MODULES = {
+    "PDFHandler": "pdf_handler",
+    "TextHandler": "text_handler",
+    "ImageHandler": "image_handler",
+    "XLSHandler": "xls_handler",
+    "XLSXHandler": "xlsx_handler",
+    "DocHandler": "doc_handler",
+    "SQLiteHandler": "sqlite_handler",
+    "ODPHandler": "odp_handler",
+    "ODTHandler": "odt_handler",
+    "ODSHandler": "ods_handler",
+    "PPTXHandler": "pptx_handler",
+    "MetadataHandler": "metadata_handler",
+    "CompositeHandler": "composite_handler",
+    "ArchiveHandler": "archive_handler",
+}
+
+def __getattr__(name):
+    if name not in MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(f".{MODULES[name]}", __name__), name)
@@ -0,0 +1,138 @@
+# archive_handler.py
+import gzip
+import io
+import os
+import tarfile
+import zipfile
+from .base_handler import BaseHandler
+from registry import REGISTRY
+from scanner import Scanner
+from searcher import resolve
+from sniffer import Sniffer
+
+class ArchiveHandler(BaseHandler):
+    COST = 4
+    CACHEABLE = False
+    EXECUTOR = "processes"
+    SEPARATOR = "!/"
+    ARCHIVE_TYPES = ("*.zip", "*.tar", "*.tgz", "*.gz")
+    GZIP_MAGIC = b"\x1f\x8b"
+    DEFAULT_DEPTH = 2
+    DEFAULT_MAX_MEMBER_SIZE = 64 * 1024 * 1024
+    DEFAULT_MAX_MEMBERS = 10000
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.handler_args = args[2:]
+        self.handler_kwargs = dict(kwargs, cache=None)
+        self.max_depth = self.options.get("archive_depth")
+        if self.max_depth is None:
+            self.max_depth = self.DEFAULT_DEPTH
+        self.max_member_size = self.options.get("archive_max_member_size") or self.DEFAULT_MAX_MEMBER_SIZE
+        self.max_members = self.options.get("archive_max_members") or self.DEFAULT_MAX_MEMBERS
+        self.file_types = self.options.get("file_types") or []
+        self.sniff = self.options.get("sniff", False)
+        self.scanner = Scanner([], self.file_types, self.options.get("skip_patterns") or [], untyped=self.sniff)
+        self.handlers = {}
+
+    def plan(self, file_paths):
+        if self.max_depth < 1:
+            self.verbose_print(f"Archive descent disabled, skipping {len(file_paths)} archives")
+            return []
+        return [(self, self.process_archive, file_paths)]
+
+    def process_archive(self, file_path):
+        results = []
+        try:
+            with open(file_path, 'rb') as stream:
+                results = self.search_archive(file_path, stream, 1)
+        except Exception as e:
+            self.error_handler(str(e), file_path)
+        return results
+
+    def search_archive(self, archive_path, stream, depth):
+        results = []
+        for count, (name, size, member) in enumerate(self.iter_members(archive_path, stream), 1):
+            if count > self.max_members:
+                self.verbose_print(f"Stopping after {self.max_members} members of {archive_path}")
+                break
+            member_path = archive_path + self.SEPARATOR + name
+            try:
+                results.extend(self.search_member(member_path, size, member, depth))
+            except Exception as e:
+                self.error_handler(str(e), member_path)
+        return results
+
+    def iter_members(self, archive_path, stream):
+        if zipfile.is_zipfile(stream):
+            stream.seek(0)
+            with zipfile.ZipFile(stream) as archive:
+                for info in archive.infolist():
+                    if not info.is_dir():
+                        with archive.open(info) as member:
+                            yield info.filename, info.file_size, member
+            return
+        stream.seek(0)
+        try:
+            archive = tarfile.open(fileobj=stream, mode='r|*')
+        except tarfile.ReadError:
+            archive = None
+        if archive is not None:
+            with archive:
+                for info in archive:
+                    if info.isfile():
+                        yield info.name, info.size, archive.extractfile(info)
+            return
+        stream.seek(0)
+        if stream.read(2) != self.GZIP_MAGIC:
+            raise ValueError("unsupported archive format")
+        stream.seek(-4, os.SEEK_END)
+        size = int.from_bytes(stream.read(4), 'little')
+        stream.seek(0)
+        name = os.path.basename(archive_path.split(self.SEPARATOR)[-1])
+        with gzip.GzipFile(fileobj=stream) as member:
+            yield name[:-3] if name.lower().endswith('.gz') else name, size, member
+
+    def search_member(self, member_path, size, member, depth):
+        file_type = self.classify(member_path)
+        if file_type is None:
+            return []
+        if size > self.max_member_size:
+            self.verbose_print(f"Skipping {member_path}: larger than {self.max_member_size} bytes")
+            return []
+        data = self.read_member(member_path, member)
+        if data is None:
+            return []
+        if self.sniff:
+            kind = Sniffer().identify(data.read(Sniffer.SNIFF_SIZE))
+            data.seek(0)
+            file_type = resolve(file_type, kind, self.binary_files, self.file_types)
+            if file_type is None:
+                self.verbose_print(f"Skipping {member_path}: {kind} content")
+                return []
+        if file_type in self.ARCHIVE_TYPES:
+            if depth >= self.max_depth:
+                self.verbose_print(f"Skipping {member_path}: nested deeper than {self.max_depth} archives")
+                return []
+            return self.search_archive(member_path, data, depth + 1)
+        handler = self.member_handler(file_type)
+        if not handler.STREAMABLE:
+            self.verbose_print(f"Skipping {member_path}: {type(handler).__name__} cannot read archive members")
+            return []
+        return handler.search_stream(member_path, data)
+
+    def read_member(self, member_path, member):
+        data = member.read(self.max_member_size + 1)
+        if len(data) > self.max_member_size:
+            self.verbose_print(f"Skipping {member_path}: larger than {self.max_member_size} bytes")
+            return None
+        return io.BytesIO(data)
+
+    def classify(self, member_path):
+        return self.scanner.classify(member_path.rsplit('/', 1)[-1])
+
+    def member_handler(self, file_type):
+        if file_type not in self.handlers:
+            handler_class = REGISTRY.get(file_type)
+            self.handlers[file_type] = handler_class(self.search_strings, file_type, *self.handler_args, **self.handler_kwargs)
+        return self.handlers[file_type]
@@ -1,19 +1,41 @@
 # base_handler.py
-import subprocess
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import asyncio
+import io
+import math
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from contextlib import nullcontext
 from functools import partial
+from matcher import MatchCollector, MatchPolicy, Matcher
 from models import FileResult
+from engine import run_coroutine
+from stats import count, record_call, record_coroutine, timed
 
 class BaseHandler:
-    def __init__(self, search_strings, file_type, search_path, verbose,  ignore_errors, binary_files=None, case_sensitive=False, fixed=False):
+    VERSION = 1
+    COST = 5
+    CACHEABLE = True
+    STREAMABLE = False
+    EXECUTOR = "threads"
+    IN_FLIGHT_PER_WORKER = 4
+
+    def __init__(self, search_strings, file_type, verbose, ignore_errors, binary_files=None, case_sensitive=False, fixed=False, grep=False, cache=None, executor="threads", jobs=None, context=Matcher.DEFAULT_CONTEXT, full_content=False, policy=None, stats=None, **options):
         self.search_strings = search_strings
         self.file_type = file_type
-        self.search_path = search_path
         self.verbose = verbose
         self.ignore_errors = ignore_errors
         self.binary_files = binary_files
         self.case_sensitive = case_sensitive
         self.fixed = fixed
+        self.grep = grep
+        self.cache = cache
+        self.executor = executor
+        self.jobs = jobs
+        self.full_content = full_content
+        self.policy = policy or MatchPolicy()
+        self.stats = stats
+        self.options = options
+        self.matcher = Matcher(search_strings, case_sensitive, fixed, binary_files, context)
 
     def verbose_print(self, *messages):
         if self.verbose:
@@ -21,30 +43,154 @@ class BaseHandler:
 
     def error_handler(self, err, file_path):
         if err:
+            count("errors")
             if self.ignore_errors:
                 self.verbose_print(f"Ignoring error: {err}")
             else:
                 raise Exception(f"Error occurred during search execution in {file_path}: {err}")
 
-    def process_files_in_parallel(self, find_cmd, process_func):
-        proc = subprocess.Popen(find_cmd, stdout=subprocess.PIPE)
-        out, _ = proc.communicate()
-        results = []
-        if out:
-            file_paths = out.decode().split('\0')
-            self.verbose_print(f"Processing {len(file_paths)} files...")
-            with ThreadPoolExecutor() as executor:
-                futures = {executor.submit(partial(process_func, file_path)): file_path for file_path in file_paths if file_path}
-                try:
-                    for future in as_completed(futures):
-                        result = future.result()
-                        if result:
-                            results.extend(result)
-                except KeyboardInterrupt:
-                    for future in futures:
-                        future.cancel()
-                    raise
+    def new_collector(self):
+        return MatchCollector(self.policy, self.matcher.term_count)
+
+    def collect(self, matches):
+        collector = self.new_collector()
+        collector.add(matches)
+        return collector
+
+    def create_results(self, file_path, collector, content=None):
+        if not collector.accepted():
+            return []
+        matches = [] if self.policy.files_with_matches else collector.matches
+        if not self.full_content:
+            content = None
+        elif content is None:
+            content = self.read_content(file_path)
+        return [FileResult(file_path, self.file_type, content, matches)]
+
+    def match_content(self, content):
+        return self.collect(self.matcher.match_text(content))
+
+    def search_stream(self, file_path, stream):
+        content = self.extract_text(io.BytesIO(stream.read()))
+        return self.create_results(file_path, self.match_content(content), content)
+
+    def open_source(self, source):
+        if isinstance(source, str):
+            return open(source, 'rb')
+        return nullcontext(source)
+
+    def extract_text(self, file_path):
+        raise NotImplementedError("Subclasses with extractable content must implement this method.")
+
+    def read_content(self, file_path):
+        content, stat = self.cached_content(file_path)
+        if content is None:
+            with timed("extract_seconds"):
+                content = self.extract_text(file_path)
+            self.store_content(file_path, stat, content)
+        return content
+
+    def cached_content(self, file_path):
+        if self.cache is None or not self.CACHEABLE:
+            return None, None
+        stat = os.stat(file_path)
+        content = self.cache.get(os.path.abspath(file_path), type(self).__name__, self.VERSION, stat)
+        if content is not None:
+            count("cache_hits")
+            self.verbose_print(f"Using cached content for {file_path}")
+        return content, stat
+
+    def store_content(self, file_path, stat, content):
+        if stat is not None:
+            self.cache.put(os.path.abspath(file_path), type(self).__name__, self.VERSION, stat, content)
+
+    def read_contents(self, file_paths, extract_batch):
+        contents = {}
+        pending = {}
+        for file_path in file_paths:
+            try:
+                content, stat = self.cached_content(file_path)
+            except Exception as e:
+                self.error_handler(str(e), file_path)
+                continue
+            if content is None:
+                pending[file_path] = stat
+            else:
+                contents[file_path] = content
+        if pending:
+            with timed("extract_seconds"):
+                extracted = extract_batch(list(pending))
+            for file_path, content in extracted.items():
+                self.store_content(file_path, pending[file_path], content)
+                contents[file_path] = content
+        return contents
+
+    def split_batches(self, file_paths, batch_size, workers):
+        size = max(1, min(batch_size, math.ceil(len(file_paths) / workers)))
+        return [file_paths[i:i + size] for i in range(0, len(file_paths), size)]
+
+    def preferred_executor(self):
+        return self.EXECUTOR
+
+    def resource_class(self):
+        return self.preferred_executor() if self.executor == "hybrid" else self.executor
+
+    def create_executor(self):
+        resource = self.resource_class()
+        if resource == "processes":
+            return ProcessPoolExecutor(max_workers=self.jobs)
+        if resource == "subprocess":
+            return ThreadPoolExecutor(max_workers=self.jobs or os.cpu_count() or 1)
+        return ThreadPoolExecutor(max_workers=self.jobs)
+
+    def max_in_flight(self):
+        return (self.jobs or os.cpu_count() or 1) * self.IN_FLIGHT_PER_WORKER
+
+    def process_files_in_parallel(self, file_paths, process_func):
+        if not file_paths:
+            return
+        self.verbose_print(f"Processing {len(file_paths)} files...")
+        max_in_flight = self.max_in_flight()
+        with self.create_executor() as executor:
+            futures = set()
+            try:
+                for file_path in file_paths:
+                    if not file_path:
+                        continue
+                    futures.add(executor.submit(self.task(process_func, file_path)))
+                    if len(futures) >= max_in_flight:
+                        done, futures = wait(futures, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            yield from self.finish(future)
+                for future in as_completed(futures):
+                    yield from self.finish(future)
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+    def task(self, process_func, item):
+        if asyncio.iscoroutinefunction(process_func):
+            return partial(run_coroutine, partial(self.coroutine, process_func), item)
+        if self.stats is not None:
+            return partial(record_call, process_func, item)
+        return partial(process_func, item)
+
+    def coroutine(self, process_func, item):
+        if self.stats is not None:
+            return record_coroutine(process_func, item)
+        return process_func(item)
+
+    def finish(self, future):
+        results = future.result() or []
+        if self.stats is not None:
+            results, record = results
+            self.stats.record(type(self).__name__, record)
         return results
 
-    def search(self):
+    def plan(self, file_paths):
         raise NotImplementedError("Subclasses must implement this method.")
+
+    def search(self, file_paths):
+        for handler, process_func, items in self.plan(file_paths):
+            yield from handler.process_files_in_parallel(items, process_func)
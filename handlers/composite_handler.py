@@ -4,15 +4,15 @@ from .image_handler import ImageHandler
 from .metadata_handler import MetadataHandler
 
 class CompositeHandler(BaseHandler):
-    def __init__(self, search_strings, file_type, search_path, verbose,  ignore_errors=True, binary_files=None, case_sensitive=False, fixed=False):
-        super().__init__(search_strings, file_type, search_path, verbose,  ignore_errors, binary_files, case_sensitive, fixed)
+    def __init__(self, search_strings, file_type, verbose, ignore_errors=True, binary_files=None, case_sensitive=False, fixed=False, **kwargs):
+        super().__init__(search_strings, file_type, verbose, ignore_errors, binary_files, case_sensitive, fixed, **kwargs)
         self.handlers = [
-            ImageHandler(search_strings, file_type, search_path, verbose,  ignore_errors, binary_files, case_sensitive, fixed),
-            MetadataHandler(search_strings, file_type, search_path, verbose,  ignore_errors, binary_files, case_sensitive, fixed)
+            ImageHandler(search_strings, file_type, verbose, ignore_errors, binary_files, case_sensitive, fixed, **kwargs),
+            MetadataHandler(search_strings, file_type, verbose, ignore_errors, binary_files, case_sensitive, fixed, **kwargs)
         ]
 
-    def search(self):
-        results = []
-        for handler in self.handlers:
-            results.extend(handler.search())
-        return results
+    def read_content(self, file_path):
+        return "\n".join(handler.read_content(file_path) for handler in self.handlers)
+
+    def plan(self, file_paths):
+        return [task for handler in self.handlers for task in handler.plan(file_paths)]
@@ -1,23 +1,9 @@
 # doc_handler.py
-import docx
-from .base_handler import BaseHandler
-from models import FileResult
+from .office_handler import OfficeHandler
+from .office_xml import read_docx
 
-class DocHandler(BaseHandler):
-    def search(self):
-        find_cmd = ['find', self.search_path, '-type', 'f', '-iname', self.file_type, '-print0']
-        return self.process_files_in_parallel(find_cmd, self.process_doc)
+class DocHandler(OfficeHandler):
+    COST = 3
 
-    def process_doc(self, file_path):
-        results = []
-        try:
-            doc = docx.Document(file_path)
-            text = ""
-            for para in doc.paragraphs:
-                text += para.text
-            for search_string in self.search_strings:
-                if search_string in text:
-                    results.append(FileResult(file_path, self.file_type, text))
-        except Exception as e:
-            self.error_handler(str(e), file_path)
-        return results
+    def read(self, source):
+        return read_docx(source)
@@ -0,0 +1,99 @@
+# exiftool.py
+import atexit
+import itertools
+import json
+import os
+import queue
+import subprocess
+import threading
+
+class ExifTool:
+    def __init__(self, executable="exiftool"):
+        self.executable = executable
+        self.process = None
+        self.counter = itertools.count(1)
+
+    def start(self):
+        self.process = subprocess.Popen(
+            [self.executable, '-stay_open', 'True', '-@', '-'],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+
+    def running(self):
+        return self.process is not None and self.process.poll() is None
+
+    def execute(self, *args):
+        if not self.running():
+            self.start()
+        number = next(self.counter)
+        sentinel = f"{{ready{number}}}".encode()
+        command = "\n".join(args + (f"-execute{number}",)) + "\n"
+        self.process.stdin.write(command.encode('utf-8'))
+        self.process.stdin.flush()
+        fd = self.process.stdout.fileno()
+        output = b""
+        while not output.rstrip().endswith(sentinel):
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                raise RuntimeError("exiftool exited unexpectedly")
+            output += chunk
+        return output.rstrip()[:-len(sentinel)]
+
+    def metadata(self, file_paths):
+        output = self.execute('-json', '-G', '-charset', 'filename=utf8', *file_paths)
+        if not output.strip():
+            return []
+        return json.loads(output.decode('utf-8', errors='ignore'))
+
+    def close(self):
+        if not self.running():
+            return
+        try:
+            self.process.stdin.write(b"-stay_open\nFalse\n")
+            self.process.stdin.flush()
+            self.process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+            self.process.wait()
+        self.process = None
+
+class ExifToolPool:
+    def __init__(self, size, executable="exiftool"):
+        self.size = size
+        self.executable = executable
+        self.idle = queue.LifoQueue()
+        self.created = []
+        self.lock = threading.Lock()
+        self.pid = os.getpid()
+
+    def acquire(self):
+        if self.pid != os.getpid():
+            self.__init__(self.size, self.executable)
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self.lock:
+            if len(self.created) < self.size:
+                exiftool = ExifTool(self.executable)
+                self.created.append(exiftool)
+                return exiftool
+        return self.idle.get()
+
+    def metadata(self, file_paths):
+        exiftool = self.acquire()
+        try:
+            return exiftool.metadata(file_paths)
+        except Exception:
+            exiftool.close()
+            raise
+        finally:
+            self.idle.put(exiftool)
+
+    def close(self):
+        with self.lock:
+            for exiftool in self.created:
+                exiftool.close()
+
+EXIFTOOL_POOL = ExifToolPool(min(4, os.cpu_count() or 1))
+atexit.register(EXIFTOOL_POOL.close)
@@ -1,14 +1,72 @@
+import asyncio
 from .base_handler import BaseHandler
-from models import FileResult
-import subprocess
+from engine import ENGINE
+from models import Match
+from stats import count, timed
 
 class GrepHandler(BaseHandler):
-    def execute_search(self, cmd, file_path):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.tool_timeout = self.options.get("tool_timeout")
+
+    def preferred_executor(self):
+        return "subprocess" if self.grep else self.EXECUTOR
+
+    async def execute_search(self, cmd, file_path):
         self.verbose_print("Executing:", ' '.join(cmd))
-        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        out, err = proc.communicate()
+        count("subprocesses")
+        try:
+            with timed("subprocess_seconds"):
+                _, out, err = await ENGINE.run(cmd, self.tool_timeout)
+        except asyncio.TimeoutError:
+            self.error_handler(f"{cmd[0]} timed out after {self.tool_timeout}s", file_path)
+            return ""
+        except OSError as e:
+            self.error_handler(str(e), file_path)
+            return ""
         if out:
-            return True
+            return out.decode(errors='ignore')
         if err:
             self.error_handler(err.decode(errors='ignore'), file_path)
-        return False
\ No newline at end of file
+        return ""
+
+    def max_count_arguments(self):
+        limit = self.policy.limit()
+        return ['-m', str(limit)] if limit else []
+
+    async def grep_matches(self, cmd, file_path, location, offsets=False):
+        collector = self.new_collector()
+        terms = list(dict.fromkeys(self.search_strings))
+        output = await self.execute_search(self.grep_command(cmd, self.max_count_arguments(), terms, file_path), file_path)
+        collector.add(self.parse_matches(output, file_path, location, offsets))
+        limit = self.policy.limit()
+        while self.policy.all_terms and limit and len(collector.matches) >= limit and not collector.done:
+            missing = [term for term in terms if term not in collector.terms]
+            output = await self.execute_search(self.grep_command(cmd, ['-m', '1'], missing, file_path), file_path)
+            seen = len(collector.terms)
+            collector.add(self.parse_matches(output, file_path, location, offsets))
+            if len(collector.terms) == seen:
+                break
+        return collector
+
+    def grep_command(self, cmd, max_count, terms, file_path):
+        return cmd + max_count + [argument for term in terms for argument in ('-e', term)] + [file_path]
+
+    def parse_matches(self, output, file_path, location, offsets=False):
+        matches = []
+        prefix = f"{file_path}:"
+        fields = 3 if offsets else 2
+        for line in output.splitlines():
+            if not line.startswith(prefix):
+                continue
+            parts = line[len(prefix):].split(':', fields - 1)
+            if len(parts) < fields or not all(part.isdigit() for part in parts[:-1]):
+                continue
+            number, text = int(parts[0]), parts[-1]
+            if location == 'line':
+                found = self.matcher.match_text(text, number, int(parts[1]) if offsets else None)
+            else:
+                found = self.matcher.match_text(text, None, **{location: number})
+            search_string = self.search_strings[0]
+            matches.extend(found or [Match(search_string, text.strip()[:2 * self.matcher.context + len(search_string)], **{location: number})])
+        return matches
\ No newline at end of file
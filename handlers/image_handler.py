@@ -1,21 +1,119 @@
 # image_handler.py
+import asyncio
+import os
+import tempfile
 from .base_handler import BaseHandler
+from engine import ENGINE
 import pytesseract
-from PIL import Image
-from models import FileResult
+from PIL import Image, ImageFilter, ImageStat
+from stats import count
 
 class ImageHandler(BaseHandler):
-    def search(self):
-        find_cmd = ['find', self.search_path, '-type', 'f', '-iname', self.file_type, '-print0']
-        return self.process_files_in_parallel(find_cmd, self.process_image)
+    COST = 10
+    VERSION = 2
+    EXECUTOR = "subprocess"
+    MIN_SIDE = 32
+    MIN_EDGE_DENSITY = 0.1
+    DEFAULT_MAX_SIDE = 2500
+    DEFAULT_BATCH_SIZE = 8
+    DEFAULT_TIMEOUT = 60
 
-    def process_image(self, file_path):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.workers = self.jobs or os.cpu_count() or 1
+        self.batch_size = self.options.get("ocr_batch_size") or self.DEFAULT_BATCH_SIZE
+        self.max_side = self.options.get("ocr_max_side") or self.DEFAULT_MAX_SIDE
+        self.timeout = self.options.get("ocr_timeout") or self.DEFAULT_TIMEOUT
+        self.prefilter = self.options.get("ocr_prefilter", True)
+
+    def resource_class(self):
+        return "subprocess"
+
+    def plan(self, file_paths):
+        batches = self.split_batches(file_paths, self.batch_size, self.workers)
+        return [(self, self.process_batch, batches)]
+
+    def process_batch(self, file_paths):
         results = []
-        try:
-            text = pytesseract.image_to_string(Image.open(file_path))
-            for search_string in self.search_strings:
-                if search_string in text:
-                    results.append(FileResult(file_path, self.file_type, text))
-        except Exception as e:
-            self.error_handler(str(e), file_path)
+        for file_path, text in self.read_contents(file_paths, self.ocr).items():
+            try:
+                results.extend(self.create_results(file_path, self.collect(self.matcher.match_text(text)), text))
+            except Exception as e:
+                self.error_handler(str(e), file_path)
         return results
+
+    def extract_text(self, file_path):
+        texts = self.ocr([file_path])
+        if file_path not in texts:
+            raise RuntimeError(f"OCR failed for {file_path}")
+        return texts[file_path]
+
+    def ocr(self, file_paths):
+        texts = {}
+        if not file_paths:
+            return texts
+        with tempfile.TemporaryDirectory(prefix="fcf-ocr-") as temp_dir:
+            sources = {}
+            for number, file_path in enumerate(file_paths):
+                try:
+                    source = self.prepare(file_path, os.path.join(temp_dir, f"{number}.png"))
+                except Exception as e:
+                    self.error_handler(str(e), file_path)
+                    continue
+                if source is None:
+                    self.verbose_print(f"Skipping OCR for {file_path}: unlikely to contain text")
+                    texts[file_path] = ""
+                else:
+                    sources[file_path] = source
+            if len(sources) > 1:
+                texts.update(self.ocr_batch(sources, temp_dir))
+            for file_path, source in sources.items():
+                if file_path not in texts:
+                    count("subprocesses")
+                    try:
+                        texts[file_path] = pytesseract.image_to_string(source, timeout=self.timeout)
+                    except Exception as e:
+                        self.error_handler(str(e), file_path)
+        return texts
+
+    def prepare(self, file_path, temp_path):
+        with Image.open(file_path) as image:
+            if self.prefilter and (min(image.size) < self.MIN_SIDE or self.edge_density(image) < self.MIN_EDGE_DENSITY):
+                return None
+            if max(image.size) <= self.max_side and '\n' not in file_path:
+                return file_path
+            image = image.convert("RGB") if image.mode not in ("1", "L", "RGB") else image.copy()
+            image.thumbnail((self.max_side, self.max_side))
+            image.save(temp_path)
+            return temp_path
+
+    def edge_density(self, image):
+        sample = image.convert("L")
+        sample.thumbnail((256, 256))
+        edges = sample.filter(ImageFilter.FIND_EDGES)
+        if min(edges.size) > 2:
+            edges = edges.crop((1, 1, edges.width - 1, edges.height - 1))
+        return ImageStat.Stat(edges).mean[0]
+
+    def ocr_batch(self, sources, temp_dir):
+        list_path = os.path.join(temp_dir, "images.txt")
+        with open(list_path, "w") as list_file:
+            list_file.write("\n".join(sources.values()) + "\n")
+        cmd = [pytesseract.pytesseract.tesseract_cmd, list_path, "stdout"]
+        self.verbose_print("Executing:", ' '.join(cmd))
+        count("subprocesses")
+        try:
+            returncode, out, _ = ENGINE.call(ENGINE.run(
+                cmd, self.timeout * len(sources), env=dict(os.environ, OMP_THREAD_LIMIT="1")
+            ))
+        except asyncio.TimeoutError:
+            self.verbose_print(f"Batched OCR timed out, retrying {len(sources)} images one by one")
+            return {}
+        except OSError as e:
+            self.verbose_print(f"Batched OCR failed ({e}), retrying {len(sources)} images one by one")
+            return {}
+        pages = out.decode('utf-8', errors='ignore').split('\f')
+        if returncode != 0 or len(pages) < len(sources):
+            self.verbose_print(f"Batched OCR failed, retrying {len(sources)} images one by one")
+            return {}
+        return dict(zip(sources, pages))
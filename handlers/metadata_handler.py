@@ -1,21 +1,97 @@
 # metadata_handler.py
-import subprocess
+import json
+import os
+import mutagen
 from .base_handler import BaseHandler
-from models import FileResult
+from .exiftool import EXIFTOOL_POOL
+from engine import ENGINE
 
 class MetadataHandler(BaseHandler):
-    def search(self):
-        find_cmd = ['find', self.search_path, '-type', 'f', '-iname', self.file_type, '-print0']
-        return self.process_files_in_parallel(find_cmd, self.process_metadata)
+    COST = 6
+    VERSION = 2
+    EXECUTOR = "subprocess"
+    BATCH_SIZE = 32
+    AUDIO_TYPES = ("*.mp3", "*.flac", "*.ogg", "*.wav", "*.m4a")
+    SKIPPED_GROUPS = ("SourceFile", "System:", "ExifTool:")
 
-    def process_metadata(self, file_path):
+    def plan(self, file_paths):
+        batches = self.split_batches(file_paths, self.BATCH_SIZE, self.jobs or os.cpu_count() or 1)
+        return [(self, self.process_batch, batches)]
+
+    def process_batch(self, file_paths):
         results = []
+        for file_path, metadata in self.read_contents(file_paths, self.extract_batch).items():
+            try:
+                results.extend(self.create_results(file_path, self.match_tags(metadata), metadata))
+            except Exception as e:
+                self.error_handler(str(e), file_path)
+        return results
+
+    def match_tags(self, metadata):
+        collector = self.new_collector()
+        for line in metadata.splitlines():
+            tag, _, value = line.partition(": ")
+            if collector.add(self.matcher.match_text(value, first_line=None, tag=tag)):
+                break
+        return collector
+
+    def extract_batch(self, file_paths):
+        metadata = {}
+        remaining = []
+        for file_path in file_paths:
+            tags = self.read_audio_tags(file_path) if self.file_type in self.AUDIO_TYPES else None
+            if tags:
+                metadata[file_path] = self.format_tags(tags)
+            elif '\n' in file_path:
+                metadata[file_path] = self.read_single(file_path)
+            else:
+                remaining.append(file_path)
+        if remaining:
+            try:
+                entries = EXIFTOOL_POOL.metadata(remaining)
+            except Exception as e:
+                self.error_handler(str(e), ", ".join(remaining))
+                entries = []
+            for entry in entries:
+                metadata[entry.get("SourceFile")] = self.format_tags(entry)
+            for file_path in remaining:
+                if file_path not in metadata:
+                    self.error_handler("exiftool returned no metadata", file_path)
+        return metadata
+
+    def read_audio_tags(self, file_path):
         try:
-            metadata = subprocess.check_output(['exiftool', file_path], universal_newlines=False)
-            metadata = metadata.decode('utf-8', errors='ignore')
-            for search_string in self.search_strings:
-                if search_string in metadata:
-                    results.append(FileResult(file_path, self.file_type, metadata))
+            audio = mutagen.File(file_path, easy=True)
         except Exception as e:
-            self.error_handler(str(e), file_path)
-        return results
+            self.verbose_print(f"mutagen could not read {file_path}: {e}")
+            return None
+        if audio is None or not audio.tags:
+            return None
+        kind = type(audio).__name__
+        tags = {f"{kind}:{key}": value for key, value in audio.tags.items()}
+        if audio.info is not None and getattr(audio.info, "length", None):
+            tags[f"{kind}:Duration"] = round(audio.info.length, 2)
+        return tags
+
+    def read_single(self, file_path):
+        returncode, output, err = ENGINE.call(ENGINE.run(['exiftool', '-json', '-G', file_path]))
+        if returncode != 0:
+            raise RuntimeError(err.decode('utf-8', errors='ignore').strip() or f"exiftool exited with status {returncode}")
+        entries = json.loads(output.decode('utf-8', errors='ignore'))
+        return self.format_tags(entries[0] if entries else {})
+
+    def format_tags(self, tags):
+        lines = []
+        for tag, value in tags.items():
+            if tag.startswith(self.SKIPPED_GROUPS):
+                continue
+            if isinstance(value, list):
+                value = ", ".join(str(item) for item in value)
+            lines.append(f"{tag}: {' '.join(str(value).split())}")
+        return "\n".join(lines)
+
+    def extract_text(self, file_path):
+        metadata = self.extract_batch([file_path])
+        if file_path not in metadata:
+            raise RuntimeError(f"No metadata extracted for {file_path}")
+        return metadata[file_path]
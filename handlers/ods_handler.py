@@ -0,0 +1,7 @@
+# ods_handler.py
+from .spreadsheet_handler import SpreadsheetHandler
+from .office_xml import read_ods
+
+class ODSHandler(SpreadsheetHandler):
+    def read_rows(self, source, keep=None):
+        return read_ods(source)
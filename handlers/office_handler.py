@@ -0,0 +1,71 @@
+# office_handler.py
+import io
+import os
+from .base_handler import BaseHandler
+
+class OfficeHandler(BaseHandler):
+    COST = 2
+    VERSION = 3
+    STREAMABLE = True
+    EXECUTOR = "processes"
+    UNIT = None
+    MATCH_BATCH = 256
+    CACHE_MAX_SIZE = 4 * 1024 * 1024
+
+    def plan(self, file_paths):
+        return [(self, self.process_document, file_paths)]
+
+    def process_document(self, file_path):
+        results = []
+        try:
+            if self.full_content or self.cache is not None and os.path.getsize(file_path) <= self.CACHE_MAX_SIZE:
+                text = self.read_content(file_path)
+                results = self.create_results(file_path, self.match_content(text), text)
+            else:
+                results = self.create_results(file_path, self.match_stream(file_path))
+        except Exception as e:
+            self.error_handler(str(e), file_path)
+        return results
+
+    def search_stream(self, file_path, stream):
+        source = io.BytesIO(stream.read())
+        content = self.extract_text(source) if self.full_content else None
+        if content is not None:
+            return self.create_results(file_path, self.match_content(content), content)
+        source.seek(0)
+        return self.create_results(file_path, self.match_stream(source), content)
+
+    def read(self, source):
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    def match_stream(self, source):
+        collector = self.new_collector()
+        lines, start = [], None
+        for text, location in self.read(source):
+            if lines and (len(lines) >= self.MATCH_BATCH or not self.continues(start, len(lines), location)):
+                if collector.add(self.matcher.match_text("\n".join(lines), **start)):
+                    return collector
+                lines = []
+            if not lines:
+                start = location
+            lines.append(text)
+        if lines:
+            collector.add(self.matcher.match_text("\n".join(lines), **start))
+        return collector
+
+    def continues(self, start, count, location):
+        if start["first_line"] is None or location["first_line"] != start["first_line"] + count:
+            return False
+        return self.UNIT is None or location[self.UNIT] == start[self.UNIT]
+
+    def match_content(self, content):
+        if self.UNIT is None:
+            return super().match_content(content)
+        return self.matcher.match_units(content.split('\f'), self.UNIT, self.new_collector())
+
+    def extract_text(self, source):
+        units = [[]]
+        for text, location in self.read(source):
+            units.extend([] for _ in range(location.get(self.UNIT, 1) - len(units)))
+            units[-1].append(text)
+        return "\f".join("\n".join(lines) for lines in units)
@@ -0,0 +1,257 @@
+# office_xml.py
+import posixpath
+import re
+import zipfile
+from xml.etree import ElementTree as ET
+
+OFFICE = "{urn:oasis:names:tc:opendocument:xmlns:office:1.0}"
+TEXT = "{urn:oasis:names:tc:opendocument:xmlns:text:1.0}"
+DRAW = "{urn:oasis:names:tc:opendocument:xmlns:drawing:1.0}"
+TABLE = "{urn:oasis:names:tc:opendocument:xmlns:table:1.0}"
+WORD = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+DRAWING = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+PRESENTATION = "{http://schemas.openxmlformats.org/presentationml/2006/main}"
+SHEET = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+RELATIONSHIP = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PACKAGE_RELATIONSHIP = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+ODF_PARAGRAPHS = (TEXT + "p", TEXT + "h")
+ODF_SEPARATORS = {TEXT + "tab": "\t", TEXT + "line-break": " "}
+ODF_SPACE = TEXT + "s"
+ODF_SPACE_COUNT = TEXT + "c"
+ODF_ANNOTATION = OFFICE + "annotation"
+ODF_CELLS = (TABLE + "table-cell", TABLE + "covered-table-cell")
+FLATTEN = re.compile(r"[\n\r\f\v]")
+COLUMNS = {}
+
+def iter_blocks(xml_file, block_tags, unit_tags=()):
+    parents = []
+    nested = 0
+    for event, element in ET.iterparse(xml_file, events=("start", "end")):
+        if event == "start":
+            if nested:
+                nested += 1
+            elif element.tag in block_tags:
+                nested = 1
+            else:
+                if element.tag in unit_tags:
+                    yield "unit", element
+                parents.append(element)
+            continue
+        if nested > 1:
+            nested -= 1
+            continue
+        if nested:
+            nested = 0
+            yield "block", element
+        else:
+            parents.pop()
+        element.clear()
+        if parents:
+            parents[-1].remove(element)
+
+def odf_text(element, parts):
+    if element.text:
+        parts.append(element.text)
+    for child in element:
+        tag = child.tag
+        if tag in ODF_SEPARATORS:
+            parts.append(ODF_SEPARATORS[tag])
+        elif tag == ODF_SPACE:
+            parts.append(" " * int(child.get(ODF_SPACE_COUNT, 1)))
+        elif tag != ODF_ANNOTATION:
+            odf_text(child, parts)
+        if child.tail:
+            parts.append(child.tail)
+    return parts
+
+def paragraph_text(element):
+    if not len(element):
+        return FLATTEN.sub(" ", element.text or "")
+    return FLATTEN.sub(" ", "".join(odf_text(element, [])))
+
+def run_text(element, text_tag, tab_tag=None, break_tags=()):
+    parts = []
+    for node in element.iter():
+        if node.tag == text_tag:
+            parts.append(node.text or "")
+        elif node.tag == tab_tag and not node.attrib:
+            parts.append("\t")
+        elif node.tag in break_tags:
+            parts.append(" ")
+    return FLATTEN.sub(" ", "".join(parts))
+
+def open_member(archive, name):
+    try:
+        return archive.open(name)
+    except KeyError:
+        return None
+
+def read_odf(source, unit_tag=None, unit=None):
+    with zipfile.ZipFile(source) as archive:
+        xml_file = open_member(archive, "content.xml")
+        if xml_file is None:
+            return
+        with xml_file:
+            number = line = 0
+            for kind, element in iter_blocks(xml_file, ODF_PARAGRAPHS, (unit_tag,) if unit_tag else ()):
+                if kind == "unit":
+                    number += 1
+                    line = 0
+                elif unit is None or number:
+                    line += 1
+                    location = {"first_line": line}
+                    if unit is not None:
+                        location[unit] = number
+                    yield paragraph_text(element), location
+
+def read_odt(source):
+    return read_odf(source)
+
+def read_odp(source):
+    return read_odf(source, DRAW + "page", "slide")
+
+def read_ods(source):
+    with zipfile.ZipFile(source) as archive:
+        xml_file = open_member(archive, "content.xml")
+        if xml_file is None:
+            return
+        with xml_file:
+            sheet, row = None, 0
+            for kind, element in iter_blocks(xml_file, (TABLE + "table-row",), (TABLE + "table",)):
+                if kind == "unit":
+                    sheet, row = element.get(TABLE + "name"), 0
+                    continue
+                row += 1
+                cells = []
+                column = 0
+                for cell in element:
+                    if cell.tag not in ODF_CELLS:
+                        continue
+                    column += 1
+                    text = " ".join(paragraph_text(paragraph) for paragraph in cell.iter(TEXT + "p"))
+                    if text:
+                        cells.append((column, text))
+                    column += int(cell.get(TABLE + "number-columns-repeated", 1)) - 1
+                if cells:
+                    yield sheet, row, cells
+                row += int(element.get(TABLE + "number-rows-repeated", 1)) - 1
+
+def read_docx(source):
+    with zipfile.ZipFile(source) as archive:
+        xml_file = open_member(archive, "word/document.xml")
+        if xml_file is None:
+            return
+        with xml_file:
+            line = 0
+            for _, element in iter_blocks(xml_file, (WORD + "p",)):
+                line += 1
+                yield run_text(element, WORD + "t", WORD + "tab", (WORD + "br", WORD + "cr")), {"first_line": line}
+
+def relationships(archive, part):
+    directory, name = posixpath.split(part)
+    xml_file = open_member(archive, posixpath.join(directory, "_rels", name + ".rels"))
+    if xml_file is None:
+        return {}
+    with xml_file:
+        root = ET.parse(xml_file).getroot()
+    targets = {}
+    for relationship in root.iter(PACKAGE_RELATIONSHIP + "Relationship"):
+        target = relationship.get("Target", "")
+        targets[relationship.get("Id")] = target[1:] if target.startswith("/") else posixpath.normpath(posixpath.join(directory, target))
+    return targets
+
+def slide_parts(archive):
+    xml_file = open_member(archive, "ppt/presentation.xml")
+    if xml_file is not None:
+        with xml_file:
+            root = ET.parse(xml_file).getroot()
+        targets = relationships(archive, "ppt/presentation.xml")
+        slides = [targets.get(slide.get(RELATIONSHIP + "id")) for slide in root.iter(PRESENTATION + "sldId")]
+        if slides and all(slides):
+            return slides
+    names = [name for name in archive.namelist() if re.fullmatch(r"ppt/slides/slide\d+\.xml", name)]
+    return sorted(names, key=lambda name: int(re.search(r"\d+", posixpath.basename(name)).group()))
+
+def read_pptx(source):
+    with zipfile.ZipFile(source) as archive:
+        for number, part in enumerate(slide_parts(archive), 1):
+            xml_file = open_member(archive, part)
+            if xml_file is None:
+                continue
+            with xml_file:
+                line = 0
+                for _, element in iter_blocks(xml_file, (DRAWING + "p",)):
+                    line += 1
+                    yield run_text(element, DRAWING + "t", break_tags=(DRAWING + "br",)), {"first_line": line, "slide": number}
+
+def shared_strings(archive, keep=None):
+    strings = []
+    xml_file = open_member(archive, "xl/sharedStrings.xml")
+    if xml_file is None:
+        return strings
+    with xml_file:
+        for _, element in iter_blocks(xml_file, (SHEET + "si",)):
+            parts = []
+            for child in element:
+                if child.tag == SHEET + "t":
+                    parts.append(child.text or "")
+                elif child.tag == SHEET + "r":
+                    parts.extend(text.text or "" for text in child.iter(SHEET + "t"))
+            text = FLATTEN.sub(" ", "".join(parts))
+            strings.append(text if keep is None or keep(text) else None)
+    return strings
+
+def sheet_parts(archive):
+    xml_file = open_member(archive, "xl/workbook.xml")
+    if xml_file is None:
+        return []
+    with xml_file:
+        root = ET.parse(xml_file).getroot()
+    targets = relationships(archive, "xl/workbook.xml")
+    return [(sheet.get("name"), targets.get(sheet.get(RELATIONSHIP + "id"))) for sheet in root.iter(SHEET + "sheet")]
+
+def column_number(reference):
+    letters = (reference or "").rstrip("0123456789")
+    number = COLUMNS.get(letters)
+    if number is None:
+        number = 0
+        for letter in letters:
+            if not "A" <= letter <= "Z":
+                return None
+            number = number * 26 + ord(letter) - ord("A") + 1
+        COLUMNS[letters] = number = number or None
+    return number
+
+def cell_value(cell, strings):
+    cell_type = cell.get("t")
+    if cell_type == "inlineStr":
+        return FLATTEN.sub(" ", "".join(text.text or "" for text in cell.iter(SHEET + "t")))
+    value = cell.find(SHEET + "v")
+    if value is None or value.text is None:
+        return ""
+    if cell_type == "s":
+        index = int(value.text)
+        return (strings[index] if index < len(strings) else None) or ""
+    return FLATTEN.sub(" ", value.text)
+
+def read_xlsx(source, keep=None):
+    with zipfile.ZipFile(source) as archive:
+        strings = shared_strings(archive, keep)
+        for sheet, part in sheet_parts(archive):
+            xml_file = open_member(archive, part) if part else None
+            if xml_file is None:
+                continue
+            with xml_file:
+                row = 0
+                for _, element in iter_blocks(xml_file, (SHEET + "row",)):
+                    row = int(element.get("r") or row + 1)
+                    cells = []
+                    column = 0
+                    for cell in element.iter(SHEET + "c"):
+                        column = column_number(cell.get("r")) or column + 1
+                        text = cell_value(cell, strings)
+                        if text:
+                            cells.append((column, text))
+                    if cells:
+                        yield sheet, row, cells
@@ -1,36 +1,71 @@
+import asyncio
 import PyPDF2
 from .grep_handler import GrepHandler
-from models import FileResult
+from stats import timed_iter
 
 class PDFHandler(GrepHandler):
-    def __init__(self, search_strings, file_type, search_path, verbose,  ignore_errors, binary_files=None, case_sensitive=None, fixed=False):
-        super().__init__(search_strings, file_type, search_path, verbose,  True, binary_files, case_sensitive, fixed)
+    COST = 4
+    VERSION = 2
+    STREAMABLE = True
+    EXECUTOR = "processes"
 
-    def search(self):
-        find_cmd = ['find', self.search_path, '-type', 'f', '-iname', self.file_type, '-print0']
-        return self.process_files_in_parallel(find_cmd, self.process_pdf)
+    def __init__(self, search_strings, file_type, verbose, ignore_errors, binary_files=None, case_sensitive=None, fixed=False, **kwargs):
+        super().__init__(search_strings, file_type, verbose, True, binary_files, case_sensitive, fixed, **kwargs)
+
+    def plan(self, file_paths):
+        return [(self, self.process_pdf_with_pdfgrep if self.grep else self.process_pdf, file_paths)]
 
     def process_pdf(self, file_path):
         results = []
-        for search_string in self.search_strings:
-            grep_cmd = ['pdfgrep', '-H']
-            if self.fixed:
-                grep_cmd.append('-F')
-            if not self.case_sensitive:
-                grep_cmd.append('-i')
-            grep_cmd.extend([search_string, file_path])
-            if self.execute_search(grep_cmd, file_path):
-                file_content = self.read_pdf_content(file_path)
-                results.append(FileResult(file_path, self.file_type, file_content))
+        try:
+            collector = self.new_collector()
+            for page_number, page_text in enumerate(self.iter_pages(file_path), 1):
+                if collector.add(self.matcher.match_text(page_text, page=page_number)):
+                    break
+            results = self.create_results(file_path, collector)
+        except Exception as e:
+            self.error_handler(str(e), file_path)
         return results
 
+    async def process_pdf_with_pdfgrep(self, file_path):
+        grep_cmd = ['pdfgrep', '-H', '-n']
+        if self.fixed:
+            grep_cmd.append('-F')
+        if not self.case_sensitive:
+            grep_cmd.append('-i')
+        collector = await self.grep_matches(grep_cmd, file_path, 'page')
+        content = None
+        if collector.accepted() and self.full_content:
+            content = await asyncio.to_thread(self.read_pdf_content, file_path)
+        return self.create_results(file_path, collector, content)
+
     def read_pdf_content(self, file_path):
         file_content = ""
         try:
-            with open(file_path, 'rb') as file:
-                reader = PyPDF2.PdfReader(file)
-                for page in reader.pages:
-                    file_content += page.extract_text()
+            file_content = self.read_content(file_path)
         except Exception as e:
             self.error_handler(str(e), file_path)
         return file_content
+
+    def match_content(self, content):
+        return self.matcher.match_units(content.split('\f'), 'page', self.new_collector())
+
+    def iter_pages(self, file_path):
+        content, stat = self.cached_content(file_path)
+        if content is not None:
+            yield from content.split('\f')
+            return
+        pages = []
+        for page_text in timed_iter(self.extract_pages(file_path), "extract_seconds"):
+            pages.append(page_text)
+            yield page_text
+        self.store_content(file_path, stat, '\f'.join(pages))
+
+    def extract_pages(self, file_path):
+        with self.open_source(file_path) as file:
+            reader = PyPDF2.PdfReader(file)
+            for page in reader.pages:
+                yield (page.extract_text() or "").replace('\f', '\n')
+
+    def extract_text(self, file_path):
+        return '\f'.join(self.extract_pages(file_path))
@@ -1,25 +1,10 @@
 # pptx_handler.py
-from pptx import Presentation
-from .base_handler import BaseHandler
-from models import FileResult
+from .office_handler import OfficeHandler
+from .office_xml import read_pptx
 
-class PPTXHandler(BaseHandler):
-    def search(self):
-        find_cmd = ['find', self.search_path, '-type', 'f', '-iname', self.file_type, '-print0']
-        return self.process_files_in_parallel(find_cmd, self.process_pptx)
+class PPTXHandler(OfficeHandler):
+    COST = 3
+    UNIT = "slide"
 
-    def process_pptx(self, file_path):
-        results = []
-        try:
-            prs = Presentation(file_path)
-            text = ""
-            for slide in prs.slides:
-                for shape in slide.shapes:
-                    if hasattr(shape, "text"):
-                        text += shape.text
-            for search_string in self.search_strings:
-                if search_string in text:
-                    results.append(FileResult(file_path, self.file_type, text))
-        except Exception as e:
-            self.error_handler(str(e), file_path)
-        return results
+    def read(self, source):
+        return read_pptx(source)
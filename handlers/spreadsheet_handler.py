@@ -0,0 +1,43 @@
+# spreadsheet_handler.py
+import io
+from .base_handler import BaseHandler
+
+class SpreadsheetHandler(BaseHandler):
+    COST = 3
+    VERSION = 4
+    STREAMABLE = True
+    EXECUTOR = "processes"
+
+    def plan(self, file_paths):
+        return [(self, self.process_spreadsheet, file_paths)]
+
+    def process_spreadsheet(self, file_path):
+        results = []
+        try:
+            results = self.create_results(file_path, self.match_rows(file_path))
+        except Exception as e:
+            self.error_handler(str(e), file_path)
+        return results
+
+    def search_stream(self, file_path, stream):
+        source = io.BytesIO(stream.read())
+        content = self.extract_text(source) if self.full_content else None
+        source.seek(0)
+        return self.create_results(file_path, self.match_rows(source), content)
+
+    def read_rows(self, source, keep=None):
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    def match_rows(self, source):
+        collector = self.new_collector()
+        rows = self.read_rows(source, self.matcher.search)
+        try:
+            for sheet, row, cells in rows:
+                if collector.add(self.matcher.match_row(cells, sheet=sheet, row=row)):
+                    break
+        finally:
+            rows.close()
+        return collector
+
+    def extract_text(self, source):
+        return "\n".join("\t".join(text for _, text in cells) for _, _, cells in self.read_rows(source))
@@ -1,33 +1,126 @@
 # sqlite_handler.py
+import os
+import re
 import sqlite3
+from pathlib import Path
 from .base_handler import BaseHandler
-from models import FileResult
+
+FTS5_SHADOW_SUFFIXES = ('_data', '_idx', '_content', '_docsize', '_config')
+FTS5_TOKENIZE = re.compile(r"""\btokenize\s*=\s*(?:'([^']*)'|"([^"]*)"|(\w+))""", re.IGNORECASE)
+FTS5_UNINDEXED = re.compile(r'\bUNINDEXED\b', re.IGNORECASE)
+FTS5_CONTENT = re.compile(r'\bcontent\s*=', re.IGNORECASE)
+FTS5_CASE_SENSITIVE = re.compile(r'\bcase_sensitive\s+1\b', re.IGNORECASE)
 
 class SQLiteHandler(BaseHandler):
-    def search(self):
-        find_cmd = ['find', self.search_path, '-type', 'f', '-iname', self.file_type, '-print0']
-        return self.process_files_in_parallel(find_cmd, self.process_sqlite)
+    COST = 2
+    def plan(self, file_paths):
+        return [(self, self.process_sqlite, file_paths)]
+
+    def connect(self, file_path):
+        uri = Path(os.path.abspath(file_path)).as_uri() + '?mode=ro&immutable=1'
+        conn = sqlite3.connect(uri, uri=True)
+        conn.create_function('fcf_match', -1, self.row_matches, deterministic=True)
+        return conn
 
     def process_sqlite(self, file_path):
-        results = []
         try:
-            conn = sqlite3.connect(file_path)
-            cursor = conn.cursor()
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-            tables = cursor.fetchall()
-            for table_name in tables:
-                table_name = table_name[0]
-                cursor.execute(f"PRAGMA table_info({table_name});")
-                columns = cursor.fetchall()
-                column_names = [column[1] for column in columns]
-                for column in column_names:
-                    for search_string in self.search_strings:
-                        cursor.execute(f"SELECT * FROM {table_name} WHERE {column} LIKE ?", ('%' + search_string + '%',))
-                        rows = cursor.fetchall()
-                        if rows:
-                            content = f"Found in table {table_name}, column {column}"
-                            results.append(FileResult(file_path, self.file_type, content))
+            conn = self.connect(file_path)
+        except Exception as e:
+            self.error_handler(str(e), file_path)
+            return []
+        try:
+            collector = self.search_tables(conn, file_path)
+        finally:
             conn.close()
+        try:
+            return self.create_results(file_path, collector)
         except Exception as e:
             self.error_handler(str(e), file_path)
-        return results
+            return []
+
+    def search_tables(self, conn, file_path):
+        collector = self.new_collector()
+        try:
+            tables = self.list_tables(conn)
+        except sqlite3.Error as e:
+            self.error_handler(str(e), file_path)
+            return collector
+        for table_name, fts_sql in tables:
+            try:
+                if self.search_table(conn, table_name, fts_sql, collector):
+                    break
+            except sqlite3.Error as e:
+                self.error_handler(f"table {table_name}: {e}", file_path)
+        return collector
+
+    def list_tables(self, conn):
+        tables = conn.execute("SELECT name, sql FROM sqlite_master WHERE type='table';").fetchall()
+        fts_tables = {name: sql for name, sql in tables if sql and re.search(r'\bUSING\s+fts5\b', sql, re.IGNORECASE)}
+        shadow_tables = {name + suffix for name in fts_tables for suffix in FTS5_SHADOW_SUFFIXES}
+        return [(name, fts_tables.get(name)) for name, _ in tables if name not in shadow_tables]
+
+    def search_table(self, conn, table_name, fts_sql, collector):
+        quoted_table = self.quote(table_name)
+        columns = [column[1] for column in conn.execute(f'PRAGMA table_info({quoted_table});')]
+        if not columns:
+            return False
+        column_list = ", ".join(self.quote(column) for column in columns)
+        where, parameters = f"fcf_match({column_list})", ()
+        fts_query = self.fts_query(fts_sql)
+        if fts_query:
+            where, parameters = f"{quoted_table} MATCH ? AND {where}", (fts_query,)
+        query = f"SELECT {{}}, {column_list} FROM {quoted_table} WHERE {where}"
+        limit = self.policy.limit()
+        if limit and not self.policy.all_terms:
+            query += f" LIMIT {limit - len(collector.matches)}"
+        try:
+            cursor = conn.execute(query.format('rowid'), parameters)
+        except sqlite3.OperationalError:
+            cursor = conn.execute(query.format('NULL'), parameters)
+        for rowid, *values in cursor:
+            for column, value in zip(columns, values):
+                if value is not None and collector.add(self.matcher.match_text(self.to_text(value), first_line=None, table=table_name, column=column, rowid=rowid)):
+                    return True
+        return False
+
+    def fts_query(self, fts_sql):
+        if not fts_sql:
+            return None
+        match = FTS5_TOKENIZE.search(fts_sql)
+        tokenizer = next((group for group in match.groups() if group is not None), "") if match else ""
+        if 'trigram' not in tokenizer.lower():
+            return None
+        if FTS5_UNINDEXED.search(fts_sql) or FTS5_CONTENT.search(fts_sql):
+            return None
+        if FTS5_CASE_SENSITIVE.search(tokenizer) and not self.case_sensitive:
+            return None
+        terms = []
+        for search_string in self.search_strings:
+            if len(search_string) < 3 or (not self.fixed and re.escape(search_string) != search_string):
+                return None
+            terms.append('"' + search_string.replace('"', '""') + '"')
+        return " OR ".join(terms)
+
+    def row_matches(self, *values):
+        return any(self.matcher.search(self.to_text(value)) for value in values if value is not None)
+
+    @staticmethod
+    def to_text(value):
+        if isinstance(value, bytes):
+            return value.decode('utf-8', errors='ignore')
+        return str(value)
+
+    @staticmethod
+    def quote(name):
+        return '"' + name.replace('"', '""') + '"'
+
+    def extract_text(self, file_path):
+        lines = []
+        conn = self.connect(file_path)
+        try:
+            for table_name, _ in self.list_tables(conn):
+                for row in conn.execute(f'SELECT * FROM {self.quote(table_name)}'):
+                    lines.append("\t".join(self.to_text(value) for value in row if value is not None))
+        finally:
+            conn.close()
+        return "\n".join(lines)
@@ -1,24 +1,138 @@
-from .pdf_handler import GrepHandler
-from models import FileResult
+import asyncio
+import math
+import os
+from .grep_handler import GrepHandler
+from models import ByteRange, FileResult
 
 class TextHandler(GrepHandler):
-    def search(self):
-        find_cmd = ['find', self.search_path, '-type', 'f', '-iname', self.file_type, '-print0']
-        return self.process_files_in_parallel(find_cmd, self.process_text_file)
+    COST = 1
+    CACHEABLE = False
+    STREAMABLE = True
+    EXECUTOR = "processes"
+    BATCH_SIZE = 64
+    DEFAULT_SPLIT_SIZE = 256 * 1024 * 1024
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.split_size = self.options.get("split_size")
+        if self.split_size is None:
+            self.split_size = self.DEFAULT_SPLIT_SIZE
+        self.ranges = {}
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["ranges"] = {}
+        return state
+
+    def plan(self, file_paths):
+        if self.grep:
+            return [(self, self.process_text_file_with_grep, file_paths)]
+        if not self.split_size:
+            return [(self, self.process_text_batch, self.batches(file_paths))]
+        small, ranges = [], []
+        for file_path in file_paths:
+            parts = self.split(file_path)
+            if parts:
+                ranges.extend(parts)
+            else:
+                small.append(file_path)
+        return [(self, self.process_text_batch, self.batches(small)), (self, self.process_text_range, ranges)]
+
+    def batches(self, file_paths):
+        return self.split_batches(file_paths, self.BATCH_SIZE, self.jobs or os.cpu_count() or 1)
+
+    def split(self, file_path):
+        try:
+            size = os.path.getsize(file_path)
+        except OSError:
+            return None
+        if size <= self.split_size:
+            return None
+        count = math.ceil(size / self.split_size)
+        self.verbose_print(f"Splitting {file_path} into {count} ranges")
+        return [ByteRange(file_path, index * self.split_size, min(size, (index + 1) * self.split_size), index, count) for index in range(count)]
 
     def process_text_file(self, file_path):
         results = []
-        for search_string in self.search_strings:
-            grep_cmd = ['grep', '-H']
-            if self.fixed:
-                grep_cmd.append('-F')
-            if not self.case_sensitive:
-                grep_cmd.append('-i')
-            grep_cmd.extend([search_string, file_path])
-            if self.binary_files:
-                grep_cmd.insert(2, '--binary-files=text')
-            if self.execute_search(grep_cmd, file_path):
-                with open(file_path, 'r', errors='ignore') as file:
-                    file_content = file.read()
-                results.append(FileResult(file_path, self.file_type, file_content))
+        try:
+            collector = self.matcher.scan_file(file_path, self.new_collector())
+            results = self.create_results(file_path, collector)
+        except Exception as e:
+            self.error_handler(str(e), file_path)
         return results
+
+    def process_text_batch(self, file_paths):
+        results = []
+        for file_path in file_paths:
+            results.extend(self.process_text_file(file_path))
+        return results
+
+    def process_text_range(self, byte_range):
+        try:
+            collector, newlines = self.matcher.scan_range(byte_range.path, byte_range.start, byte_range.end, self.new_collector())
+        except Exception as e:
+            self.error_handler(str(e), byte_range.path)
+            return [(byte_range, None, 0)]
+        return [(byte_range, collector.matches, newlines)]
+
+    def finish(self, future):
+        results = []
+        for result in super().finish(future):
+            if isinstance(result, FileResult):
+                results.append(result)
+            else:
+                results.extend(self.merge_range(*result))
+        return results
+
+    def merge_range(self, byte_range, matches, newlines):
+        parts = self.ranges.setdefault(byte_range.path, [None] * byte_range.count)
+        parts[byte_range.index] = (matches, newlines)
+        if not all(parts):
+            return []
+        del self.ranges[byte_range.path]
+        if any(matches is None for matches, _ in parts):
+            return []
+        collector = self.new_collector()
+        lines = 0
+        for matches, newlines in parts:
+            for match in matches:
+                match.line += lines
+            if collector.add(matches):
+                break
+            lines += newlines
+        return self.create_results(byte_range.path, collector)
+
+    def read_content(self, file_path):
+        if self.split_size and os.path.getsize(file_path) > self.split_size:
+            self.verbose_print(f"Not attaching the content of {file_path}: larger than {self.split_size} bytes")
+            return None
+        return super().read_content(file_path)
+
+    def search_stream(self, file_path, stream):
+        if not self.full_content:
+            return self.create_results(file_path, self.matcher.scan_stream(stream, self.new_collector()))
+        data = stream.read()
+        if not self.binary_files and self.matcher.is_binary(data):
+            return []
+        content = data.decode('utf-8', errors='ignore')
+        return self.create_results(file_path, self.match_content(content), content)
+
+    def extract_text(self, file_path):
+        with open(file_path, 'rb') as file:
+            data = file.read()
+        if not self.binary_files and self.matcher.is_binary(data):
+            raise ValueError("binary file")
+        return data.decode('utf-8', errors='ignore')
+
+    async def process_text_file_with_grep(self, file_path):
+        grep_cmd = ['grep', '-H', '-n', '-b']
+        if self.binary_files:
+            grep_cmd.append('--binary-files=text')
+        if self.fixed:
+            grep_cmd.append('-F')
+        if not self.case_sensitive:
+            grep_cmd.append('-i')
+        collector = await self.grep_matches(grep_cmd, file_path, 'line', offsets=True)
+        if self.full_content:
+            return await asyncio.to_thread(self.create_results, file_path, collector)
+        return self.create_results(file_path, collector)
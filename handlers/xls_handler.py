@@ -1,24 +1,20 @@
 # xls_handler.py
 import xlrd
-from .base_handler import BaseHandler
-from models import FileResult
+from .spreadsheet_handler import SpreadsheetHandler
 
-class XLSHandler(BaseHandler):
-    def search(self):
-        find_cmd = ['find', self.search_path, '-type', 'f', '-iname', self.file_type, '-print0']
-        return self.process_files_in_parallel(find_cmd, self.process_xls)
-
-    def process_xls(self, file_path):
-        results = []
+class XLSHandler(SpreadsheetHandler):
+    def read_rows(self, source, keep=None):
+        if isinstance(source, str):
+            workbook = xlrd.open_workbook(source, on_demand=True)
+        else:
+            workbook = xlrd.open_workbook(file_contents=source.read(), on_demand=True)
         try:
-            workbook = xlrd.open_workbook(file_path)
-            for sheet in workbook.sheets():
-                for row_idx in range(sheet.nrows):
-                    for col_idx in range(sheet.ncols):
-                        cell_value = sheet.cell(row_idx, col_idx).value
-                        for search_string in self.search_strings:
-                            if search_string in str(cell_value):
-                                results.append(FileResult(file_path, self.file_type, str(cell_value)))
-        except Exception as e:
-            self.error_handler(str(e), file_path)
-        return results
+            for index in range(workbook.nsheets):
+                sheet = workbook.sheet_by_index(index)
+                for row in range(sheet.nrows):
+                    cells = [(column, text) for column, text in enumerate(map(str, sheet.row_values(row)), 1) if text]
+                    if cells:
+                        yield sheet.name, row + 1, cells
+                workbook.unload_sheet(index)
+        finally:
+            workbook.release_resources()
@@ -0,0 +1,7 @@
+# xlsx_handler.py
+from .spreadsheet_handler import SpreadsheetHandler
+from .office_xml import read_xlsx
+
+class XLSXHandler(SpreadsheetHandler):
+    def read_rows(self, source, keep=None):
+        return read_xlsx(source, keep)
@@ -0,0 +1,228 @@
+# index.py
+import os
+import json
+import sqlite3
+from scanner import Scanner
+
+class ContentIndex:
+    REGEX_METACHARACTERS = set('.^$*+?{}[]\\|()')
+
+    def __init__(self, path=None, searcher=None):
+        self.path = path or self.default_path()
+        self.searcher = searcher
+        self.connection = None
+
+    @staticmethod
+    def default_path():
+        cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+        return os.path.join(cache_home, 'file-content-finder', 'index.sqlite')
+
+    def connect(self):
+        if self.connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.executescript(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);"
+                "CREATE TABLE IF NOT EXISTS files ("
+                "id INTEGER PRIMARY KEY, path TEXT NOT NULL UNIQUE, file_type TEXT NOT NULL, "
+                "size INTEGER NOT NULL, mtime INTEGER NOT NULL, indexed INTEGER NOT NULL);"
+                "CREATE TABLE IF NOT EXISTS trigrams ("
+                "trigram TEXT NOT NULL, file_id INTEGER NOT NULL, PRIMARY KEY (trigram, file_id)) WITHOUT ROWID;"
+                "CREATE INDEX IF NOT EXISTS trigrams_file_id ON trigrams (file_id);"
+            )
+        return self.connection
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def roots(self):
+        row = self.connect().execute("SELECT value FROM meta WHERE key = 'roots'").fetchone()
+        return json.loads(row[0]) if row else []
+
+    def covers(self):
+        if not os.path.isfile(self.path):
+            return False
+        roots = [os.path.abspath(root).rstrip('/') + '/' for root in self.roots()]
+        return all(
+            any((os.path.abspath(search_path).rstrip('/') + '/').startswith(root) for root in roots)
+            for search_path in self.searcher.search_paths
+        )
+
+    def build(self):
+        connection = self.connect()
+        with connection:
+            connection.execute("DELETE FROM trigrams")
+            connection.execute("DELETE FROM files")
+        return self.update()
+
+    def update(self):
+        connection = self.connect()
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('roots', ?)",
+                (json.dumps([os.path.abspath(search_path) for search_path in self.searcher.search_paths]),)
+            )
+        known = {path: (file_id, size, mtime) for file_id, path, size, mtime in connection.execute("SELECT id, path, size, mtime FROM files")}
+        seen = set()
+        handlers = {}
+        added = updated = 0
+        for file_path, file_type in self.searcher.scan():
+            path = os.path.abspath(file_path)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            seen.add(path)
+            entry = known.get(path)
+            if entry and entry[1:] == (stat.st_size, stat.st_mtime_ns):
+                continue
+            self.store(connection, handlers, file_path, file_type, stat, entry)
+            if entry:
+                updated += 1
+            else:
+                added += 1
+        removed = [(entry[0],) for path, entry in known.items() if path not in seen]
+        with connection:
+            connection.executemany("DELETE FROM trigrams WHERE file_id = ?", removed)
+            connection.executemany("DELETE FROM files WHERE id = ?", removed)
+        return added, updated, len(removed)
+
+    def refresh(self, items, removed=()):
+        connection = self.connect()
+        handlers = {}
+        added = updated = 0
+        for file_path, file_type in items:
+            path = os.path.abspath(file_path)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entry = connection.execute("SELECT id, size, mtime FROM files WHERE path = ?", (path,)).fetchone()
+            if entry and entry[1:] == (stat.st_size, stat.st_mtime_ns):
+                continue
+            self.store(connection, handlers, file_path, file_type, stat, entry)
+            if entry:
+                updated += 1
+            else:
+                added += 1
+        deleted = set()
+        for path in removed:
+            path = os.path.abspath(path)
+            prefix = path.rstrip("/") + "/"
+            deleted.update(connection.execute(
+                "SELECT id FROM files WHERE path = ? OR substr(path, 1, ?) = ?", (path, len(prefix), prefix)
+            ).fetchall())
+        with connection:
+            connection.executemany("DELETE FROM trigrams WHERE file_id = ?", deleted)
+            connection.executemany("DELETE FROM files WHERE id = ?", deleted)
+        return added, updated, len(deleted)
+
+    def store(self, connection, handlers, file_path, file_type, stat, entry):
+        path = os.path.abspath(file_path)
+        if file_type not in handlers:
+            handlers[file_type] = self.searcher.create_handler(file_type)
+        trigrams = self.extract_trigrams(handlers[file_type], file_path)
+        with connection:
+            if entry:
+                connection.execute("DELETE FROM trigrams WHERE file_id = ?", (entry[0],))
+                connection.execute(
+                    "UPDATE files SET file_type = ?, size = ?, mtime = ?, indexed = ? WHERE id = ?",
+                    (file_type, stat.st_size, stat.st_mtime_ns, trigrams is not None, entry[0])
+                )
+                file_id = entry[0]
+            else:
+                file_id = connection.execute(
+                    "INSERT INTO files (path, file_type, size, mtime, indexed) VALUES (?, ?, ?, ?, ?)",
+                    (path, file_type, stat.st_size, stat.st_mtime_ns, trigrams is not None)
+                ).lastrowid
+            if trigrams:
+                connection.executemany(
+                    "INSERT INTO trigrams (trigram, file_id) VALUES (?, ?)",
+                    ((trigram, file_id) for trigram in trigrams)
+                )
+
+    def extract_trigrams(self, handler, file_path):
+        self.searcher.verbose_print(f"Indexing {file_path}...")
+        try:
+            text = handler.read_content(file_path)
+        except NotImplementedError:
+            return None
+        except Exception as e:
+            self.searcher.verbose_print(f"Indexing {file_path} failed, it will always be verified: {e}")
+            return None
+        if text is None:
+            return None
+        return self.trigrams(text)
+
+    @staticmethod
+    def trigrams(text):
+        text = text.lower()
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    def required_trigrams(self, search_string):
+        if not self.searcher.fixed and any(char in self.REGEX_METACHARACTERS for char in search_string):
+            return set()
+        return self.trigrams(search_string)
+
+    def candidates(self, search_strings, check_stale=True):
+        connection = self.connect()
+        required = [self.required_trigrams(search_string) for search_string in search_strings]
+        if any(not trigrams for trigrams in required):
+            rows = connection.execute("SELECT path, file_type, size, mtime FROM files")
+        else:
+            queries = ["SELECT id FROM files WHERE indexed = 0"]
+            parameters = []
+            for trigrams in required:
+                placeholders = ", ".join("?" for _ in trigrams)
+                queries.append(
+                    f"SELECT file_id FROM trigrams WHERE trigram IN ({placeholders}) "
+                    f"GROUP BY file_id HAVING COUNT(*) = {len(trigrams)}"
+                )
+                parameters.extend(trigrams)
+            rows = connection.execute(
+                f"SELECT path, file_type, size, mtime FROM files WHERE id IN ({' UNION '.join(queries)})",
+                parameters
+            ).fetchall()
+            if check_stale:
+                stale = connection.execute("SELECT path, file_type, size, mtime FROM files").fetchall()
+                rows = self.merge_stale(rows, stale)
+        for path, file_type, _, _ in rows:
+            if os.path.isfile(path):
+                yield path, file_type
+
+    def merge_stale(self, rows, files):
+        rows = list(rows)
+        selected = {row[0] for row in rows}
+        for path, file_type, size, mtime in files:
+            if path in selected:
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if (stat.st_size, stat.st_mtime_ns) != (size, mtime):
+                self.searcher.verbose_print(f"{path} changed since it was indexed and will be verified.")
+                rows.append((path, file_type, size, mtime))
+        return rows
+
+    def select(self, candidates):
+        scanner = Scanner(self.searcher.search_paths, self.searcher.file_types, self.searcher.skip_patterns, untyped=self.searcher.sniff)
+        search_paths = [os.path.abspath(search_path).rstrip('/') for search_path in self.searcher.search_paths]
+        items = self.scope(candidates, scanner, search_paths)
+        return self.searcher.route(items) if self.searcher.sniff else items
+
+    def scope(self, candidates, scanner, search_paths):
+        for path, _ in candidates:
+            if not any(path == search_path or path.startswith(search_path + '/') for search_path in search_paths):
+                continue
+            file_type = scanner.classify(os.path.basename(path))
+            if file_type is not None:
+                yield path, file_type
+
+    def query(self):
+        return self.searcher.search_items(self.select(self.candidates(self.searcher.search_strings)))
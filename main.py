@@ -1,10 +1,33 @@
 import argparse
+import cProfile
+import os
 import json
+import re
+import sys
+from cache import ContentCache
+from index import ContentIndex
+from matcher import MatchPolicy, Matcher
+from engine import ENGINE
+from output import output_mode, print_results
 from searcher import Searcher
+from stats import SearchStats
 
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Search for strings in various file types, including PDF, text, image, xls, doc, sqlite, and odp files.")
-    parser.add_argument("search_strings", nargs="+", help="The strings to search for.")
+DEFAULT_SKIP = [
+    '.db',
+    '.db-wal',
+    '.gpg',
+    '.iso',
+    '.ldb',
+    '.lnk',
+    '.log',
+    '.old',
+    '.pod',
+    '.xcf',
+]
+
+def build_parser(parser_class=argparse.ArgumentParser):
+    parser = parser_class(description="Search for strings in various file types, including PDF, text, image, xls, doc, sqlite, and odp files.")
+    parser.add_argument("search_strings", nargs="*", help="The strings to search for.")
     parser.add_argument(
         "-t", "--types",
         nargs="*",
@@ -14,8 +37,7 @@ if __name__ == "__main__":
     parser.add_argument(
         "-p", "--paths",
         nargs="+",
-        help="The paths to search in. If not provided, the current directory will be used.",
-        default=["."]
+        help="The paths to search in. If not provided, the current directory will be used."
     )
     parser.add_argument(
         "-v", "--verbose",
@@ -43,6 +65,11 @@ if __name__ == "__main__":
         action="store_true",
         help="Treat binary files as text for searching."
     )
+    parser.add_argument(
+        "--no-sniff",
+        action="store_true",
+        help="Route files by their extension only instead of sniffing their content type; files without an extension are skipped."
+    )
     parser.add_argument(
         "-c", "--case-sensitive",
         action="store_true",
@@ -53,40 +80,308 @@ if __name__ == "__main__":
         action="store_true",
         help="Perform fixed-string search (disables regex)."
     )
+    terms = parser.add_mutually_exclusive_group()
+    terms.add_argument(
+        "--all-terms",
+        action="store_true",
+        help="Only report files that match every search string."
+    )
+    terms.add_argument(
+        "--any-term",
+        action="store_true",
+        help="Report files that match any search string (default)."
+    )
+    parser.add_argument(
+        "--first-match",
+        action="store_true",
+        help="Stop searching a file after its first match."
+    )
+    parser.add_argument(
+        "-m", "--max-count",
+        type=int,
+        help="Stop searching a file after this many matches."
+    )
+    parser.add_argument(
+        "-l", "--files-with-matches",
+        action="store_true",
+        help="Only report the paths of matching files, stopping at the first match in each."
+    )
+    parser.add_argument(
+        "--max-results",
+        type=int,
+        help="Stop the whole search after this many matching files."
+    )
+    parser.add_argument(
+        "-g", "--grep",
+        action="store_true",
+        help="Use the external grep and pdfgrep commands instead of the built-in matcher for text and PDF files."
+    )
     parser.add_argument(
         "-j", "--json",
         action="store_true",
         help="Output results in JSON format."
     )
+    parser.add_argument(
+        "--context",
+        type=int,
+        default=Matcher.DEFAULT_CONTEXT,
+        help="Number of characters to show around each match."
+    )
+    parser.add_argument(
+        "--full-content",
+        action="store_true",
+        help="Include the full extracted content of each matching file in the results."
+    )
+    parser.add_argument(
+        "--ndjson",
+        action="store_true",
+        help="Output one JSON object per line as soon as each result is found."
+    )
+    parser.add_argument(
+        "-e", "--executor",
+        choices=["threads", "processes", "hybrid"],
+        default="hybrid",
+        help="Run handlers in threads, in processes, or let each handler pick (hybrid, the default)."
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        help="Size of the shared worker pools used for all file types (defaults to the number of CPUs)."
+    )
+    parser.add_argument(
+        "--ocr-timeout",
+        type=int,
+        help="Seconds after which OCR of a single image is abandoned (default 60)."
+    )
+    parser.add_argument(
+        "--ocr-max-side",
+        type=int,
+        help="Downscale images whose longest side exceeds this many pixels before OCR (default 2500)."
+    )
+    parser.add_argument(
+        "--ocr-batch-size",
+        type=int,
+        help="Number of images passed to one tesseract invocation (default 8)."
+    )
+    parser.add_argument(
+        "--no-ocr-filter",
+        action="store_true",
+        help="Run OCR on every image, including tiny ones and images with too few edges to contain text."
+    )
+    parser.add_argument(
+        "--tool-timeout",
+        type=float,
+        help="Seconds after which an external grep or pdfgrep call is killed and reported as an error."
+    )
+    parser.add_argument(
+        "--tool-concurrency",
+        type=int,
+        default=ENGINE.DEFAULT_CONCURRENCY,
+        help="Maximum number of external tool processes running at the same time."
+    )
+    parser.add_argument(
+        "--split-size",
+        type=int,
+        help="Search text files larger than this many MiB in byte ranges of this size on several workers (default 256, 0 disables)."
+    )
+    parser.add_argument(
+        "--archive-depth",
+        type=int,
+        help="How many levels of nested zip/tar/gz archives to search inside (default 2, 0 disables archive search)."
+    )
+    parser.add_argument(
+        "--archive-member-size",
+        type=int,
+        help="Skip archive members larger than this many MiB (default 64)."
+    )
+    parser.add_argument(
+        "--archive-max-members",
+        type=int,
+        help="Stop reading an archive after this many members (default 10000)."
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Directory of the extracted-text cache (defaults to ~/.cache/file-content-finder)."
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=ContentCache.DEFAULT_MAX_SIZE // (1024 * 1024),
+        help="Maximum size of the extracted-text cache in MiB."
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read from or write to the extracted-text cache."
+    )
+    parser.add_argument(
+        "--prune-cache",
+        action="store_true",
+        help="Remove stale entries from the extracted-text cache and shrink it to --cache-size."
+    )
+    parser.add_argument(
+        "--index-build",
+        action="store_true",
+        help="Build a full-text index over the given paths and exit."
+    )
+    parser.add_argument(
+        "--index-update",
+        action="store_true",
+        help="Re-index only new, changed and deleted files and exit."
+    )
+    parser.add_argument(
+        "-q", "--query",
+        action="store_true",
+        help="Answer the search from the full-text index, verifying only candidate files."
+    )
+    parser.add_argument(
+        "--index-file",
+        help="Location of the full-text index (defaults to ~/.cache/file-content-finder/index.sqlite)."
+    )
+    parser.add_argument(
+        "--workers",
+        nargs="+",
+        help="Distribute the search over worker processes started with 'python cluster.py --listen ADDRESS --root DIR' (host:port or unix:/path); every worker must see the searched paths under the same names."
+    )
+    parser.add_argument(
+        "--local-workers",
+        type=int,
+        default=0,
+        help="Start this many worker processes on this machine and distribute the search over them."
+    )
+    parser.add_argument(
+        "--shard-by",
+        choices=["hash", "subtree"],
+        default="hash",
+        help="Split the search into shards of files assigned to workers by a hash of their path (default), or into directory subtrees that the workers walk themselves."
+    )
+    parser.add_argument(
+        "--worker-timeout",
+        type=float,
+        help="Seconds without a result or heartbeat after which a worker is considered failed and its shard is re-queued (default 60)."
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Print per-handler timings, counts and the slowest files to stderr after the search."
+    )
+    parser.add_argument(
+        "--stats-json",
+        help="Write the per-handler statistics as JSON to this file."
+    )
+    parser.add_argument(
+        "--slowest",
+        type=int,
+        default=SearchStats.DEFAULT_SLOWEST,
+        help="Number of slowest files to report per handler."
+    )
+    parser.add_argument(
+        "--trace",
+        help="Append one JSON line per processed file (or batch) with its timings to this file."
+    )
+    parser.add_argument(
+        "--profile",
+        help="Write cProfile data of the search to this file (worker processes are not profiled; combine with -e threads)."
+    )
+    return parser
+
+def validate_patterns(parser, args):
+    if args.fixed:
+        return
+    for search_string in args.search_strings:
+        try:
+            re.compile(search_string)
+        except re.error as e:
+            parser.error(f"invalid regular expression {search_string!r}: {e}")
+
+def skip_patterns(args):
+    if args.add:
+        return DEFAULT_SKIP + [pattern.lower() for pattern in args.skip]
+    return [pattern.lower() for pattern in args.skip]
+
+def create_searcher(args, paths, cache=None, stats=None, **extra):
+    policy = MatchPolicy(args.all_terms, args.first_match, args.max_count, args.files_with_matches)
+    return Searcher(args.search_strings, args.types, paths, args.verbose, args.ignore, skip_patterns(args), args.binary_files, args.case_sensitive, args.fixed, args.grep, cache, args.executor, args.jobs, args.context, args.full_content, policy, args.max_results, stats=stats, sniff=not args.no_sniff,
+                    ocr_timeout=args.ocr_timeout, ocr_max_side=args.ocr_max_side, ocr_batch_size=args.ocr_batch_size, ocr_prefilter=not args.no_ocr_filter, tool_timeout=args.tool_timeout,
+                    split_size=args.split_size if args.split_size is None else args.split_size * 1024 * 1024,
+                    archive_depth=args.archive_depth, archive_max_member_size=args.archive_member_size and args.archive_member_size * 1024 * 1024, archive_max_members=args.archive_max_members, **extra)
 
+if __name__ == "__main__":
+    parser = build_parser()
     args = parser.parse_args()
+    validate_patterns(parser, args)
 
-    default_skip = [
-        '.db',
-        '.db-wal',
-        '.gpg',
-        '.gz',
-        '.iso',
-        '.ldb',
-        '.lnk',
-        '.log',
-        '.old',
-        '.pod',
-        '.tar',
-        '.zip',
-        '.xcf',
-    ]
+    cache = None
+    if not args.no_cache:
+        cache_path = os.path.join(args.cache_dir, 'content.sqlite') if args.cache_dir else None
+        cache = ContentCache(cache_path, args.cache_size * 1024 * 1024)
 
-    if args.add:
-        skip_patterns = default_skip + [pattern.lower() for pattern in args.skip]
-    else:
-        skip_patterns = [pattern.lower() for pattern in args.skip]
+    if args.prune_cache:
+        if cache is None:
+            parser.error("--prune-cache cannot be combined with --no-cache")
+        removed = cache.prune()
+        print(f"Removed {removed} entries from the cache at {cache.path}.")
+        if not args.search_strings:
+            raise SystemExit(0)
+
+    index_mode = args.index_build or args.index_update
+    if not args.search_strings and not index_mode:
+        parser.error("the following arguments are required: search_strings")
+
+    distributed = bool(args.workers or args.local_workers)
+    if distributed and (args.stats or args.stats_json or args.trace):
+        parser.error("--stats, --stats-json and --trace cannot be combined with --workers or --local-workers")
+
+    paths = args.paths
+    if not paths and args.index_update:
+        paths = ContentIndex(args.index_file).roots()
+
+    ENGINE.configure(args.tool_concurrency)
 
-    searcher = Searcher(args.search_strings, args.types, args.paths, args.verbose, args.ignore, skip_patterns, args.binary_files, args.case_sensitive, args.fixed)
-    results = searcher.search_files()
+    stats = None
+    if args.stats or args.stats_json or args.trace:
+        stats = SearchStats(args.slowest, args.trace)
 
-    if args.json:
-        print(json.dumps([result.to_dict() for result in results], indent=4))
+    paths = paths or ["."]
+    if distributed:
+        paths = [os.path.abspath(path) for path in paths]
+    searcher = create_searcher(args, paths, cache, stats)
+    index = ContentIndex(args.index_file, searcher)
+
+    if index_mode:
+        added, updated, removed = index.build() if args.index_build else index.update()
+        print(f"Indexed {added} new and {updated} changed files, removed {removed} files from {index.path}.")
+        if not args.search_strings:
+            raise SystemExit(0)
+
+    profile = None
+    if args.profile:
+        profile = cProfile.Profile()
+        profile.enable()
+
+    if args.query and not index.covers():
+        print(f"The index at {index.path} does not cover {', '.join(paths)}, searching all files instead.", file=sys.stderr)
+        args.query = False
+
+    if distributed:
+        from cluster import search_cluster
+        candidates = index.select(index.candidates(args.search_strings)) if args.query else None
+        results = search_cluster(args, sys.argv[1:], searcher, candidates)
+    elif args.query:
+        results = index.query()
     else:
-        for result in results:
-            print(result)
+        results = searcher.search_files()
+
+    print_results(results, output_mode(args))
+
+    if profile is not None:
+        profile.disable()
+        profile.dump_stats(args.profile)
+
+    if stats is not None:
+        stats.close()
+        if args.stats:
+            print(stats.summary(), file=sys.stderr)
+        if args.stats_json:
+            with open(args.stats_json, "w") as stats_file:
+                json.dump(stats.to_dict(), stats_file, indent=4)
@@ -0,0 +1,245 @@
+# matcher.py
+import os
+import re
+from models import Match
+
+try:
+    from re import _parser as sre_parse
+except ImportError:
+    import sre_parse
+
+class Matcher:
+    CHUNK_SIZE = 1024 * 1024
+    BINARY_SNIFF_SIZE = 8192
+    DEFAULT_CONTEXT = 40
+    MAX_OVERLAP = 64 * 1024
+    LINE_LIMIT = 1024 * 1024
+    UNJOINABLE = re.compile(r"\\[AZ]|\(\?<[=!]")
+    GLOBAL_FLAGS = re.compile(r"\(\?[aiLmsux]+\)")
+
+    def __init__(self, search_strings, case_sensitive=False, fixed=False, binary_files=False, context=DEFAULT_CONTEXT):
+        self.search_strings = list(search_strings)
+        self.case_sensitive = case_sensitive
+        self.fixed = fixed
+        self.binary_files = binary_files
+        self.context = context
+        self.term_count = len(set(self.search_strings))
+        flags = re.MULTILINE
+        if not case_sensitive:
+            flags |= re.IGNORECASE
+        expressions = [re.escape(search_string) if fixed else search_string for search_string in self.search_strings]
+        self.patterns = [re.compile(expression, flags) for expression in expressions]
+        parsed = [sre_parse.parse(expression, flags) for expression in expressions]
+        default_flags = sre_parse.parse("", flags).state.flags
+        combinable = [self.combinable(tree, default_flags) and not self.GLOBAL_FLAGS.search(expression) for expression, tree in zip(expressions, parsed)]
+        shared = [expression for expression, ok in zip(expressions, combinable) if ok]
+        self.combined = re.compile("|".join(f"(?:{expression})" for expression in shared), flags) if shared else None
+        self.separate = [pattern for pattern, ok in zip(self.patterns, combinable) if not ok]
+        self.overlap = self.max_match_bytes(parsed)
+        self.joinable = not any(self.UNJOINABLE.search(expression) for expression in expressions)
+
+    def max_match_bytes(self, parsed):
+        widths = [tree.getwidth()[1] for tree in parsed]
+        return min(self.MAX_OVERLAP, 4 * (max(widths, default=0) + self.context))
+
+    @classmethod
+    def combinable(cls, tree, default_flags):
+        return not tree.state.groupdict and tree.state.flags == default_flags and not cls.references_groups(tree)
+
+    @classmethod
+    def references_groups(cls, node):
+        if isinstance(node, sre_parse.SubPattern):
+            node = node.data
+        if not isinstance(node, (list, tuple)):
+            return False
+        if len(node) == 2 and str(node[0]) in ("GROUPREF", "GROUPREF_EXISTS"):
+            return True
+        return any(cls.references_groups(child) for child in node)
+
+    def search(self, text):
+        if self.combined is not None and self.combined.search(text):
+            return True
+        return any(pattern.search(text) for pattern in self.separate)
+
+    def matched_terms(self, text, exclude=()):
+        if not self.search(text):
+            return []
+        return [
+            search_string
+            for search_string, pattern in zip(self.search_strings, self.patterns)
+            if search_string not in exclude and pattern.search(text)
+        ]
+
+    def find_matches(self, text):
+        if not self.search(text):
+            return []
+        found = []
+        for search_string, pattern in zip(self.search_strings, self.patterns):
+            found.extend((match.start(), match.end(), search_string) for match in pattern.finditer(text))
+        found.sort(key=lambda match: match[0])
+        return found
+
+    def snippet(self, text, start, end):
+        line_start = text.rfind('\n', 0, start) + 1
+        line_end = text.find('\n', end)
+        if line_end == -1:
+            line_end = len(text)
+        return text[max(line_start, start - self.context):min(line_end, end + self.context)].strip()
+
+    def match_text(self, text, first_line=1, first_offset=None, end=None, **location):
+        matches = []
+        line, position, offset = first_line, 0, first_offset
+        for start, stop, search_string in self.find_matches(text):
+            if end is not None and start >= end:
+                break
+            if line is not None:
+                line += text.count('\n', position, start)
+            if offset is not None:
+                offset += len(text[position:start].encode('utf-8'))
+            position = start
+            matches.append(Match(search_string, self.snippet(text, start, stop), line=line, offset=offset, **location))
+        return matches
+
+    def match_row(self, cells, **location):
+        if self.joinable and not self.search("\n".join(text for _, text in cells)):
+            return []
+        matches = []
+        for column, text in cells:
+            matches.extend(self.match_text(text, first_line=None, column=column, **location))
+        return matches
+
+    def match_units(self, units, unit, collector):
+        for number, text in enumerate(units, 1):
+            if collector.add(self.match_text(text, **{unit: number})):
+                break
+        return collector
+
+    def is_binary(self, data):
+        return b'\0' in data[:self.BINARY_SNIFF_SIZE]
+
+    def scan_file(self, file_path, collector):
+        with open(file_path, 'rb') as file:
+            return self.scan_stream(file, collector)
+
+    def scan_stream(self, file, collector):
+        chunk = file.read(self.CHUNK_SIZE)
+        if not self.binary_files and self.is_binary(chunk):
+            return collector
+        self.scan_chunks(iter_chunks(chunk, file, self.CHUNK_SIZE), collector)
+        return collector
+
+    def scan_chunks(self, chunks, collector, line=1, offset=0, lookahead=b''):
+        tail = b''
+        for chunk in chunks:
+            data = tail + chunk
+            cut = data.rfind(b'\n') + 1
+            if cut:
+                tail = data[cut:]
+                text, end = data[:cut].decode('utf-8', errors='ignore'), None
+            elif len(data) > self.CHUNK_SIZE:
+                cut = char_boundary(data, len(data) - self.overlap)
+                tail = data[cut:]
+                head = data[:cut].decode('utf-8', errors='ignore')
+                text, end = head + tail.decode('utf-8', errors='ignore'), len(head)
+            else:
+                tail = data
+                continue
+            if collector.add(self.match_text(text, line, offset, end)):
+                return line, offset
+            line += data.count(b'\n', 0, cut)
+            offset += cut
+        if tail:
+            head = tail.decode('utf-8', errors='ignore')
+            text = head + lookahead.decode('utf-8', errors='ignore')
+            collector.add(self.match_text(text, line, offset, len(head) if lookahead else None))
+            line += tail.count(b'\n')
+            offset += len(tail)
+        return line, offset
+
+    def scan_range(self, file_path, start, end, collector):
+        with open(file_path, 'rb') as file:
+            if not self.binary_files and self.is_binary(file.read(self.BINARY_SNIFF_SIZE)):
+                return collector, 0
+            size = os.fstat(file.fileno()).st_size
+            start, end = self.line_boundary(file, start, size), self.line_boundary(file, end, size)
+            lookahead = b''
+            if 0 < end < size:
+                file.seek(end - 1)
+                lookahead = file.read(self.overlap + 1)
+                lookahead = b'' if lookahead.startswith(b'\n') else lookahead[1:]
+            line, offset = self.scan_chunks(read_range(file, start, end, self.CHUNK_SIZE), collector, 1, start, lookahead)
+            newlines = line - 1
+            for chunk in read_range(file, offset, end, self.CHUNK_SIZE):
+                newlines += chunk.count(b'\n')
+        return collector, newlines
+
+    def line_boundary(self, file, position, size):
+        if position <= 0 or position >= size:
+            return max(0, min(position, size))
+        base = max(0, position - 4)
+        file.seek(base)
+        data = file.read(self.LINE_LIMIT + position - base)
+        newline = data.find(b'\n', position - 1 - base)
+        if newline != -1:
+            return base + newline + 1
+        return base + char_boundary(data, position - base)
+
+def read_range(file, start, end, size):
+    file.seek(start)
+    while start < end:
+        chunk = file.read(min(size, end - start))
+        if not chunk:
+            return
+        start += len(chunk)
+        yield chunk
+
+def iter_chunks(first, file, size):
+    chunk = first
+    while chunk:
+        yield chunk
+        chunk = file.read(size)
+
+def char_boundary(data, position):
+    while position > 0 and data[position] & 0xc0 == 0x80:
+        position -= 1
+    return position
+
+class MatchPolicy:
+    def __init__(self, all_terms=False, first_match=False, max_count=None, files_with_matches=False):
+        self.all_terms = all_terms
+        self.first_match = first_match
+        self.max_count = max_count
+        self.files_with_matches = files_with_matches
+
+    def limit(self):
+        if self.first_match or self.files_with_matches:
+            return 1
+        return self.max_count
+
+class MatchCollector:
+    def __init__(self, policy, term_count):
+        self.policy = policy
+        self.term_count = term_count
+        self.limit = policy.limit()
+        self.matches = []
+        self.terms = set()
+
+    def add(self, matches):
+        for match in matches:
+            if self.done:
+                break
+            if match.term not in self.terms or self.limit is None or len(self.matches) < self.limit:
+                self.matches.append(match)
+                self.terms.add(match.term)
+        return self.done
+
+    @property
+    def done(self):
+        if self.limit is None or len(self.matches) < self.limit:
+            return False
+        return not self.policy.all_terms or len(self.terms) >= self.term_count
+
+    def accepted(self):
+        if not self.matches:
+            return False
+        return not self.policy.all_terms or len(self.terms) >= self.term_count
@@ -1,21 +1,77 @@
 import json
 
+class Match:
+    __slots__ = ("term", "line", "offset", "page", "slide", "sheet", "row", "column", "table", "rowid", "tag", "snippet")
+    LOCATION_FIELDS = ("line", "offset", "page", "slide", "sheet", "row", "column", "table", "rowid", "tag")
+
+    def __init__(self, term, snippet=None, **location):
+        self.term = term
+        self.snippet = snippet
+        for field in self.LOCATION_FIELDS:
+            setattr(self, field, location.pop(field, None))
+        if location:
+            raise TypeError(f"Unknown match location fields: {', '.join(location)}")
+
+    def location(self):
+        return {field: getattr(self, field) for field in self.LOCATION_FIELDS if getattr(self, field) is not None}
+
+    def __repr__(self):
+        fields = [f"term={self.term!r}"] + [f"{field}={value!r}" for field, value in self.location().items()]
+        if self.snippet is not None:
+            fields.append(f"snippet={self.snippet!r}")
+        return f"Match({', '.join(fields)})"
+
+    def to_dict(self):
+        result = {"term": self.term}
+        result.update(self.location())
+        if self.snippet is not None:
+            result["snippet"] = self.snippet
+        return result
+
+    @classmethod
+    def from_dict(cls, data):
+        data = dict(data)
+        return cls(data.pop("term"), data.pop("snippet", None), **data)
+
+class ByteRange:
+    __slots__ = ("path", "start", "end", "index", "count")
+
+    def __init__(self, path, start, end, index, count):
+        self.path = path
+        self.start = start
+        self.end = end
+        self.index = index
+        self.count = count
+
+    def __repr__(self):
+        return f"{self.path}[{self.start}:{self.end}]"
+
 class FileResult:
-    def __init__(self, path, file_type, content):
+    __slots__ = ("path", "file_type", "content", "matches", "show_content")
+
+    def __init__(self, path, file_type, content=None, matches=None):
         self.path = path
         self.file_type = file_type
         self.content = content
+        self.matches = matches or []
         self.show_content = False
 
     def __repr__(self):
         if self.show_content:
-            return f"FileResult(path={self.path}, file_type={self.file_type}, content={self.content})"
+            return f"FileResult(path={self.path}, file_type={self.file_type}, matches={self.matches}, content={self.content})"
         else:
-            return f"FileResult(path={self.path}, file_type={self.file_type})"
+            return f"FileResult(path={self.path}, file_type={self.file_type}, matches={self.matches})"
 
     def to_dict(self):
-        return {
+        result = {
             "path": self.path,
             "file_type": self.file_type,
-            "content": self.content
+            "matches": [match.to_dict() for match in self.matches]
         }
+        if self.content is not None:
+            result["content"] = self.content
+        return result
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["path"], data["file_type"], data.get("content"), [Match.from_dict(match) for match in data.get("matches", [])])
@@ -0,0 +1,32 @@
+# output.py
+import json
+
+def output_mode(args):
+    if args.ndjson:
+        return "ndjson"
+    if args.json:
+        return "json"
+    if args.files_with_matches:
+        return "paths"
+    return "text"
+
+def print_json(results):
+    separator = "[\n"
+    for result in results:
+        item = json.dumps(result.to_dict(), indent=4).replace("\n", "\n    ")
+        print(f"{separator}    {item}", end="", flush=True)
+        separator = ",\n"
+    print("[]" if separator == "[\n" else "\n]", flush=True)
+
+def print_results(results, mode):
+    if mode == "ndjson":
+        for result in results:
+            print(json.dumps(result.to_dict()), flush=True)
+    elif mode == "json":
+        print_json(results)
+    elif mode == "paths":
+        for result in results:
+            print(result.path, flush=True)
+    else:
+        for result in results:
+            print(result, flush=True)
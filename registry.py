@@ -0,0 +1,119 @@
+# registry.py
+import hashlib
+import importlib
+import json
+import os
+import sys
+
+class HandlerRegistry:
+    ENTRY_POINT_GROUP = "file_content_finder.handlers"
+    DEFAULT = "handlers.text_handler:TextHandler"
+    BUILTIN = {
+        "*.doc": "handlers.doc_handler:DocHandler",
+        "*.docx": "handlers.doc_handler:DocHandler",
+        "*.pdf": "handlers.pdf_handler:PDFHandler",
+        "*.jpeg": "handlers.composite_handler:CompositeHandler",
+        "*.jpg": "handlers.composite_handler:CompositeHandler",
+        "*.png": "handlers.composite_handler:CompositeHandler",
+        "*.xls": "handlers.xls_handler:XLSHandler",
+        "*.xlsx": "handlers.xlsx_handler:XLSXHandler",
+        "*.ods": "handlers.ods_handler:ODSHandler",
+        "*.odp": "handlers.odp_handler:ODPHandler",
+        "*.odt": "handlers.odt_handler:ODTHandler",
+        "*.pptx": "handlers.pptx_handler:PPTXHandler",
+        "*.sqlite": "handlers.sqlite_handler:SQLiteHandler",
+        "*.mp3": "handlers.metadata_handler:MetadataHandler",
+        "*.wav": "handlers.metadata_handler:MetadataHandler",
+        "*.flac": "handlers.metadata_handler:MetadataHandler",
+        "*.mp4": "handlers.metadata_handler:MetadataHandler",
+        "*.avi": "handlers.metadata_handler:MetadataHandler",
+        "*.mov": "handlers.metadata_handler:MetadataHandler",
+        "*.wmv": "handlers.metadata_handler:MetadataHandler",
+        "*.zip": "handlers.archive_handler:ArchiveHandler",
+        "*.tar": "handlers.archive_handler:ArchiveHandler",
+        "*.tgz": "handlers.archive_handler:ArchiveHandler",
+        "*.gz": "handlers.archive_handler:ArchiveHandler",
+    }
+
+    def __init__(self, builtin=None, plugins=True, cache_path=None):
+        self.specs = dict(self.BUILTIN if builtin is None else builtin)
+        self.classes = {}
+        self.plugins_loaded = not plugins
+        self.cache_path = cache_path or self.default_cache_path()
+
+    @staticmethod
+    def default_cache_path():
+        cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+        return os.path.join(cache_home, 'file-content-finder', 'plugins.json')
+
+    def register(self, file_type, handler):
+        self.load_plugins()
+        self.specs[self.normalize(file_type)] = handler
+
+    def normalize(self, file_type):
+        file_type = file_type.lower()
+        return file_type if '*' in file_type else f"*.{file_type.lstrip('.')}"
+
+    def spec(self, file_type):
+        if file_type not in self.specs:
+            self.load_plugins()
+        return self.specs.get(file_type)
+
+    def __contains__(self, file_type):
+        return self.spec(file_type) is not None
+
+    def same(self, file_type, other):
+        spec = self.spec(file_type)
+        return spec is not None and spec == self.spec(other)
+
+    def get(self, file_type):
+        return self.resolve(self.spec(file_type) or self.DEFAULT)
+
+    def resolve(self, spec):
+        if not isinstance(spec, str):
+            return spec
+        if spec not in self.classes:
+            module_name, _, class_name = spec.partition(':')
+            self.classes[spec] = getattr(importlib.import_module(module_name), class_name)
+        return self.classes[spec]
+
+    def load_plugins(self):
+        if self.plugins_loaded:
+            return
+        self.plugins_loaded = True
+        for name, value in self.discover():
+            self.specs[self.normalize(name)] = value
+
+    def discover(self):
+        fingerprint = self.fingerprint()
+        try:
+            with open(self.cache_path) as cache_file:
+                cached = json.load(cache_file)
+            if cached.get("fingerprint") == fingerprint:
+                return cached["plugins"]
+        except (OSError, ValueError):
+            pass
+        from importlib.metadata import entry_points
+        try:
+            selected = entry_points(group=self.ENTRY_POINT_GROUP)
+        except TypeError:
+            selected = entry_points().get(self.ENTRY_POINT_GROUP, [])
+        plugins = [[entry_point.name, entry_point.value] for entry_point in selected]
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            with open(self.cache_path, "w") as cache_file:
+                json.dump({"fingerprint": fingerprint, "plugins": plugins}, cache_file)
+        except OSError:
+            pass
+        return plugins
+
+    def fingerprint(self):
+        digest = hashlib.sha1()
+        for path in sys.path:
+            try:
+                digest.update(f"{path}:{os.stat(path or '.').st_mtime_ns}\n".encode())
+            except OSError:
+                digest.update(f"{path}\n".encode())
+        return digest.hexdigest()
+
+REGISTRY = HandlerRegistry()
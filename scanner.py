@@ -0,0 +1,119 @@
+# scanner.py
+import os
+import fnmatch
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+class Scanner:
+    BATCH_SIZE = 256
+    QUEUE_SIZE = 64
+
+    def __init__(self, search_paths, file_types, skip_patterns, verbose=False, max_workers=None, untyped=False):
+        self.search_paths = search_paths
+        self.file_types = [file_type.lower() for file_type in file_types]
+        self.skip_patterns = [pattern.lower() for pattern in skip_patterns]
+        self.verbose = verbose
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self.untyped = untyped
+
+    def verbose_print(self, *messages):
+        if self.verbose:
+            print(" ".join(messages))
+
+    def classify(self, name):
+        name = name.lower()
+        ext = os.path.splitext(name)[1]
+        if ext and any(fnmatch.fnmatch(ext, pattern) for pattern in self.skip_patterns):
+            return None
+        if self.file_types:
+            for file_type in self.file_types:
+                if fnmatch.fnmatch(name, file_type):
+                    return file_type
+            return "" if self.untyped and not ext else None
+        if not ext:
+            return "" if self.untyped else None
+        return f"*{ext}"
+
+    def scan(self):
+        for search_path in self.search_paths:
+            if not os.path.isdir(search_path):
+                file_path = search_path.rstrip('/')
+                file_type = self.classify(os.path.basename(file_path))
+                if os.path.isfile(file_path) and file_type is not None:
+                    yield file_path, file_type
+                continue
+            self.verbose_print(f"Scanning {search_path}...")
+            subdirs = []
+            for entry in self.list_entries(search_path):
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    file_type = self.classify(entry.name)
+                    if file_type is not None:
+                        yield entry.path, file_type
+            yield from self.scan_in_parallel(subdirs)
+
+    def list_entries(self, directory):
+        try:
+            with os.scandir(directory) as entries:
+                return list(entries)
+        except OSError as e:
+            self.verbose_print(f"Skipping {directory}: {e}")
+            return []
+
+    def walk(self, root):
+        stack = [root]
+        while stack:
+            for entry in self.list_entries(stack.pop()):
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    file_type = self.classify(entry.name)
+                    if file_type is not None:
+                        yield entry.path, file_type
+
+    def scan_in_parallel(self, roots):
+        if not roots:
+            return
+        items = queue.Queue(self.QUEUE_SIZE)
+        stop = threading.Event()
+        done = object()
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    items.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def walk_subtree(root):
+            batch = []
+            try:
+                for item in self.walk(root):
+                    batch.append(item)
+                    if len(batch) >= self.BATCH_SIZE:
+                        if not put(batch):
+                            return
+                        batch = []
+                if batch:
+                    put(batch)
+            finally:
+                put(done)
+
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(roots)))
+        try:
+            for root in roots:
+                executor.submit(walk_subtree, root)
+            pending = len(roots)
+            while pending:
+                batch = items.get()
+                if batch is done:
+                    pending -= 1
+                else:
+                    yield from batch
+        finally:
+            stop.set()
+            executor.shutdown(wait=True)
@@ -0,0 +1,155 @@
+# scheduler.py
+import asyncio
+import heapq
+import itertools
+import os
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from engine import ENGINE
+
+POOL_LOCK = threading.Lock()
+FEED_DONE = object()
+
+def shutdown_pools(pools):
+    with POOL_LOCK:
+        executors = list(pools.values())
+        pools.clear()
+    for pool in executors:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+class Scheduler:
+    IN_FLIGHT_PER_WORKER = 2
+    MAX_IN_FLIGHT_PER_CPU = 4
+    BACKLOG_PER_SLOT = 4
+    QUEUE_SIZE = 16
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, jobs=None, stats=None, pools=None):
+        self.jobs = jobs
+        self.cpus = jobs or os.cpu_count() or 1
+        self.max_in_flight = self.cpus * self.MAX_IN_FLIGHT_PER_CPU
+        self.stats = stats
+        self.shared = pools is not None
+        self.pools = {} if pools is None else pools
+        self.started = {}
+        self.finished = {}
+
+    def workers(self, resource):
+        if resource == "async":
+            return ENGINE.concurrency
+        if resource in ("processes", "subprocess"):
+            return self.cpus
+        return self.jobs or min(32, self.cpus + 4)
+
+    def pool(self, resource):
+        with POOL_LOCK:
+            if resource not in self.pools:
+                if resource == "processes":
+                    self.pools[resource] = ProcessPoolExecutor(max_workers=self.workers(resource))
+                else:
+                    self.pools[resource] = ThreadPoolExecutor(max_workers=self.workers(resource))
+            return self.pools[resource]
+
+    def run(self, plans):
+        tasks = queue.Queue(self.QUEUE_SIZE)
+        stop = threading.Event()
+        threading.Thread(target=self.feed, args=(plans, tasks, stop), name="scheduler-feed", daemon=True).start()
+        queues = {}
+        running = {}
+        in_flight = {}
+        sequence = itertools.count()
+        feeding = True
+        try:
+            while True:
+                if feeding:
+                    feeding = self.receive(tasks, queues, running, sequence, block=not in_flight)
+                self.fill(queues, running, in_flight)
+                if not in_flight:
+                    if feeding:
+                        continue
+                    break
+                done, _ = wait(in_flight, timeout=self.POLL_INTERVAL if feeding else None, return_when=FIRST_COMPLETED)
+                for future in done:
+                    resource, handler = in_flight.pop(future)
+                    running[resource] -= 1
+                    self.finished[type(handler).__name__] = time.perf_counter()
+                    yield from handler.finish(future)
+        finally:
+            stop.set()
+            for future in in_flight:
+                future.cancel()
+            self.close()
+
+    def feed(self, plans, tasks, stop):
+        def put(task):
+            while not stop.is_set():
+                try:
+                    tasks.put(task, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        try:
+            for handler, process_func, items in plans:
+                resource = "async" if asyncio.iscoroutinefunction(process_func) else handler.resource_class()
+                items = [item for item in items if item]
+                if items and not put((resource, handler, process_func, items)):
+                    return
+        except BaseException as e:
+            put(e)
+        finally:
+            if hasattr(plans, "close"):
+                plans.close()
+            put(FEED_DONE)
+
+    def receive(self, tasks, queues, running, sequence, block):
+        backlog = sum(len(pending) for pending in queues.values())
+        while backlog < self.max_in_flight * self.BACKLOG_PER_SLOT:
+            try:
+                task = tasks.get(timeout=self.POLL_INTERVAL) if block else tasks.get_nowait()
+            except queue.Empty:
+                return True
+            if task is FEED_DONE:
+                return False
+            if isinstance(task, BaseException):
+                raise task
+            resource, handler, process_func, items = task
+            running.setdefault(resource, 0)
+            pending = queues.setdefault(resource, [])
+            for item in items:
+                heapq.heappush(pending, (handler.COST, next(sequence), handler, process_func, item))
+            backlog += len(items)
+            block = False
+        return True
+
+    def fill(self, queues, running, in_flight):
+        while True:
+            pooled = len(in_flight) - running.get("async", 0)
+            ready = [
+                resource for resource, queue in queues.items()
+                if queue and running[resource] < self.workers(resource) * self.IN_FLIGHT_PER_WORKER
+                and (resource == "async" or pooled < self.max_in_flight)
+            ]
+            if not ready:
+                return
+            resource = min(ready, key=lambda resource: queues[resource][0][:2])
+            _, _, handler, process_func, item = heapq.heappop(queues[resource])
+            if resource == "async":
+                future = ENGINE.submit(handler.coroutine(process_func, item))
+            else:
+                future = self.pool(resource).submit(handler.task(process_func, item))
+            in_flight[future] = (resource, handler)
+            running[resource] += 1
+            self.started.setdefault(type(handler).__name__, time.perf_counter())
+
+    def close(self):
+        if not self.shared:
+            shutdown_pools(self.pools)
+        if self.stats is not None:
+            for name, started in self.started.items():
+                self.stats.add_wall_time(name, self.finished.get(name, started) - started)
+        self.started = {}
+        self.finished = {}
@@ -1,20 +1,25 @@
 # searcher.py
-import os
+import asyncio
 import fnmatch
-from handlers.pdf_handler import PDFHandler
-from handlers.text_handler import TextHandler
-from handlers.xls_handler import XLSHandler
-from handlers.doc_handler import DocHandler
-from handlers.sqlite_handler import SQLiteHandler
-from handlers.odp_handler import ODPHandler
-from handlers.metadata_handler import MetadataHandler
-from handlers.composite_handler import CompositeHandler
-from handlers.pptx_handler import PPTXHandler
-from handlers.odt_handler import ODTHandler
-from models import FileResult
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+from matcher import MatchPolicy, Matcher
+from registry import REGISTRY
+from scanner import Scanner
+from scheduler import Scheduler
+from sniffer import BINARY, TEXT, Sniffer
 
 class Searcher:
-    def __init__(self, search_strings, file_types, search_paths, verbose,  ignore_errors, skip_patterns, binary_files, case_sensitive, fixed):
+    ASYNC_BUFFER = 64
+    SNIFF_BATCH = 256
+    PLAN_BATCH = 256
+    PLAN_DELAY = 0.2
+
+    def __init__(self, search_strings, file_types, search_paths, verbose,  ignore_errors, skip_patterns, binary_files, case_sensitive, fixed, grep=False, cache=None, executor="threads", jobs=None, context=Matcher.DEFAULT_CONTEXT, full_content=False, policy=None, max_results=None, stats=None, sniff=True, pools=None, **options):
         self.search_strings = search_strings
         self.file_types = file_types
         self.setSearchPaths(search_paths)
@@ -24,6 +29,18 @@ class Searcher:
         self.binary_files = binary_files
         self.case_sensitive = case_sensitive
         self.fixed = fixed
+        self.grep = grep
+        self.cache = cache
+        self.executor = executor
+        self.jobs = jobs
+        self.context = context
+        self.full_content = full_content
+        self.policy = policy or MatchPolicy()
+        self.max_results = max_results
+        self.stats = stats
+        self.sniff = sniff
+        self.pools = pools
+        self.options = options
 
     def setSearchPaths(self, search_paths):
         self.search_paths = []
@@ -37,48 +54,150 @@ class Searcher:
         if self.verbose:
             print(" ".join(messages))
 
-    def find_all_file_types(self, search_path):
-        file_types = set()
-        for root, _, files in os.walk(search_path):
-            for file in files:
-                ext = os.path.splitext(file)[1].lower()  # Normalize to lower case
-                if ext and not any(fnmatch.fnmatch(ext, pattern.lower()) for pattern in self.skip_patterns):
-                    file_types.add(f"*{ext}")
-        return list(file_types)
+    def scan(self):
+        scanner = Scanner(self.search_paths, self.file_types, self.skip_patterns, self.verbose, untyped=self.sniff)
+        items = scanner.scan()
+        return self.route(items) if self.sniff else items
+
+    def route(self, items):
+        sniffer = Sniffer(self.cache)
+        sniffed = skipped = 0
+        with ThreadPoolExecutor(max_workers=self.jobs or min(32, (os.cpu_count() or 1) + 4)) as executor:
+            while True:
+                batch = list(islice(items, self.SNIFF_BATCH))
+                if not batch:
+                    break
+                kinds = executor.map(partial(self.sniff_file, sniffer), [file_path for file_path, _ in batch])
+                for (file_path, file_type), kind in zip(batch, kinds):
+                    sniffed += 1
+                    routed = self.resolve(file_type, kind)
+                    if routed is None:
+                        skipped += 1
+                        self.verbose_print(f"Skipping {file_path}: {kind or 'unreadable'} content")
+                        continue
+                    yield file_path, routed
+        if self.stats is not None:
+            self.stats.add_sniff(sniffed, skipped)
+
+    def sniff_file(self, sniffer, file_path):
+        try:
+            return sniffer.sniff(file_path)
+        except OSError as e:
+            self.verbose_print(f"Could not sniff {file_path}: {e}")
+            return None
+
+    def resolve(self, file_type, kind):
+        return resolve(file_type, kind, self.binary_files, self.file_types)
+
+    def create_handler(self, file_type):
+        handler_class = REGISTRY.get(file_type)
+        return handler_class(self.search_strings, file_type, self.verbose, self.ignore_errors, self.binary_files, self.case_sensitive, self.fixed, grep=self.grep, cache=self.cache, executor=self.executor, jobs=self.jobs, context=self.context, full_content=self.full_content, policy=self.policy, stats=self.stats, file_types=self.file_types, skip_patterns=self.skip_patterns, sniff=self.sniff, **self.options)
 
     def search_files(self):
-        results = []
-        if not self.file_types:
-            self.file_types = set()
-            for path in self.search_paths:
-                self.file_types.update(self.find_all_file_types(path))
-            self.file_types = list(self.file_types)
-
-        dispatch = {
-            "*.doc": DocHandler,
-            "*.pdf": PDFHandler,
-            "*.jpeg": CompositeHandler,
-            "*.jpg": CompositeHandler,
-            "*.png": CompositeHandler,
-            "*.xls": XLSHandler,
-            "*.odp": ODPHandler,
-            "*.odt": ODTHandler,
-            "*.pptx": PPTXHandler,
-            "*.sqlite": SQLiteHandler,
-            "*.mp3": MetadataHandler,
-            "*.wav": MetadataHandler,
-            "*.flac": MetadataHandler,
-            "*.mp4": MetadataHandler,
-            "*.avi": MetadataHandler,
-            "*.mov": MetadataHandler,
-            "*.wmv": MetadataHandler,
-        }
-
-        for file_type in self.file_types:
-            normalized_file_type = file_type.lower()
-            for path in self.search_paths:
-                self.verbose_print(f"Searching in {file_type} files in {path} with normalized type {normalized_file_type}...")
-                handler_class = dispatch.get(normalized_file_type, TextHandler)
-                handler = handler_class(self.search_strings, normalized_file_type, path, self.verbose, self.ignore_errors, self.binary_files, self.case_sensitive, self.fixed)
-                results.extend(handler.search())
-        return results
+        return self.search_items(self.scan())
+
+    def search_items(self, items):
+        found = 0
+        results = Scheduler(self.jobs, self.stats, self.pools).run(self.plan_items(items))
+        try:
+            for result in results:
+                yield result
+                found += 1
+                if self.max_results is not None and found >= self.max_results:
+                    return
+        finally:
+            results.close()
+
+    def plan_items(self, items):
+        handlers = {}
+        pending = {}
+        scanned = 0
+        seconds = 0.0
+        items = iter(items)
+        try:
+            while True:
+                start = time.perf_counter()
+                item = next(items, None)
+                now = time.perf_counter()
+                seconds += now - start
+                if item is None:
+                    break
+                file_path, file_type = item
+                scanned += 1
+                if file_type not in handlers:
+                    handlers[file_type] = self.create_handler(file_type)
+                    self.verbose_print(f"Searching {file_type} files with {type(handlers[file_type]).__name__}...")
+                paths, _ = pending.setdefault(file_type, ([], now))
+                paths.append(file_path)
+                for file_type, (paths, since) in list(pending.items()):
+                    if len(paths) >= self.PLAN_BATCH or now - since >= self.PLAN_DELAY:
+                        del pending[file_type]
+                        yield from handlers[file_type].plan(paths)
+            for file_type, (paths, _) in pending.items():
+                yield from handlers[file_type].plan(paths)
+        finally:
+            if hasattr(items, "close"):
+                items.close()
+            if self.stats is not None:
+                self.stats.add_scan(seconds, scanned)
+
+    async def asearch_files(self):
+        async for result in self.asearch_items(self.scan()):
+            yield result
+
+    async def asearch_items(self, items):
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(self.ASYNC_BUFFER)
+        stop = threading.Event()
+        done = object()
+
+        def produce():
+            results = self.search_items(items)
+            try:
+                for result in results:
+                    if stop.is_set():
+                        break
+                    asyncio.run_coroutine_threadsafe(queue.put(result), loop).result()
+            except BaseException as e:
+                if not stop.is_set():
+                    asyncio.run_coroutine_threadsafe(queue.put(e), loop).result()
+            finally:
+                results.close()
+                if not stop.is_set():
+                    asyncio.run_coroutine_threadsafe(queue.put(done), loop).result()
+
+        producer = loop.run_in_executor(None, produce)
+        try:
+            while True:
+                result = await queue.get()
+                if result is done:
+                    break
+                if isinstance(result, BaseException):
+                    raise result
+                yield result
+        finally:
+            stop.set()
+            while not queue.empty():
+                queue.get_nowait()
+            await producer
+
+    async def asearch(self):
+        return [result async for result in self.asearch_files()]
+
+def resolve(file_type, kind, binary_files=False, file_types=()):
+    if kind is None:
+        return file_type or None
+    if kind == BINARY:
+        if file_type in REGISTRY:
+            return file_type
+        routed = (file_type or "*") if binary_files else None
+    elif kind == TEXT:
+        routed = "*.txt" if not file_type or file_type in REGISTRY else file_type
+    elif file_type in REGISTRY and (REGISTRY.same(file_type, kind) or {file_type, kind} <= set(Sniffer.ZIP_TYPES)):
+        return file_type
+    else:
+        routed = kind
+    if routed and not file_type and file_types:
+        if not any(fnmatch.fnmatch(f"file{routed[1:]}", pattern.lower()) for pattern in file_types):
+            return None
+    return routed
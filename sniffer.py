@@ -0,0 +1,81 @@
+# sniffer.py
+import os
+import struct
+
+TEXT = "text"
+BINARY = "binary"
+
+class Sniffer:
+    VERSION = 2
+    SNIFF_SIZE = 8192
+    MAGIC = (
+        (0, b"%PDF-", "*.pdf"),
+        (0, b"\x89PNG\r\n\x1a\n", "*.png"),
+        (0, b"\xff\xd8\xff", "*.jpg"),
+        (0, b"SQLite format 3\x00", "*.sqlite"),
+        (0, b"\x1f\x8b", "*.gz"),
+        (257, b"ustar", "*.tar"),
+        (0, b"ID3", "*.mp3"),
+        (0, b"fLaC", "*.flac"),
+        (4, b"ftypqt", "*.mov"),
+        (4, b"ftyp", "*.mp4"),
+        (0, b"\x30\x26\xb2\x75\x8e\x66\xcf\x11", "*.wmv"),
+    )
+    RIFF_TYPES = {b"WAVE": "*.wav", b"AVI ": "*.avi"}
+    ZIP_MAGIC = b"PK\x03\x04"
+    ZIP_MIMETYPES = {
+        b"application/vnd.oasis.opendocument.text": "*.odt",
+        b"application/vnd.oasis.opendocument.presentation": "*.odp",
+        b"application/vnd.oasis.opendocument.spreadsheet": "*.ods",
+    }
+    ZIP_PREFIXES = ((b"word/", "*.docx"), (b"ppt/", "*.pptx"), (b"xl/", "*.xlsx"))
+    ZIP_TYPES = ("*.zip", "*.odt", "*.odp", "*.ods", "*.doc", "*.docx", "*.pptx", "*.xlsx")
+    OLE_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+    OLE_WORKBOOK_MARKERS = ("Workbook".encode("utf-16-le"), "Book".encode("utf-16-le"))
+    TEXT_BOMS = (b"\xef\xbb\xbf", b"\xff\xfe", b"\xfe\xff")
+
+    def __init__(self, cache=None):
+        self.cache = cache
+
+    def sniff(self, file_path):
+        stat = os.stat(file_path)
+        path = os.path.abspath(file_path)
+        if self.cache is not None:
+            kind = self.cache.get_sniff(path, self.VERSION, stat)
+            if kind is not None:
+                return kind
+        with open(file_path, 'rb') as file:
+            kind = self.identify(file.read(self.SNIFF_SIZE))
+        if self.cache is not None:
+            self.cache.put_sniff(path, self.VERSION, stat, kind)
+        return kind
+
+    def identify(self, head):
+        for offset, magic, file_type in self.MAGIC:
+            if head.startswith(magic, offset):
+                return file_type
+        if head.startswith(b"RIFF") and head[8:12] in self.RIFF_TYPES:
+            return self.RIFF_TYPES[head[8:12]]
+        if head.startswith(self.ZIP_MAGIC):
+            return self.identify_zip(head)
+        if head.startswith(self.OLE_MAGIC):
+            return "*.xls" if any(marker in head for marker in self.OLE_WORKBOOK_MARKERS) else BINARY
+        if head.startswith(self.TEXT_BOMS) or b"\0" not in head:
+            return TEXT
+        return BINARY
+
+    def identify_zip(self, head):
+        offset = 0
+        while head.startswith(self.ZIP_MAGIC, offset) and offset + 30 <= len(head):
+            flags, method, size, name_length, extra_length = struct.unpack_from("<2xHH8xI4xHH", head, offset + 4)
+            name = head[offset + 30:offset + 30 + name_length]
+            data = offset + 30 + name_length + extra_length
+            if name == b"mimetype" and method == 0:
+                return self.ZIP_MIMETYPES.get(head[data:data + size], "*.zip")
+            for prefix, file_type in self.ZIP_PREFIXES:
+                if name.startswith(prefix):
+                    return file_type
+            if flags & 0x08:
+                break
+            offset = data + size
+        return "*.zip"
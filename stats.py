@@ -0,0 +1,190 @@
+# stats.py
+import heapq
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from models import ByteRange
+
+_record = ContextVar("record", default=None)
+
+class FileRecord:
+    __slots__ = ("label", "files", "bytes", "seconds", "extract_seconds", "subprocess_seconds", "subprocesses", "cache_hits", "errors", "results")
+    COUNTERS = ("files", "bytes", "seconds", "extract_seconds", "subprocess_seconds", "subprocesses", "cache_hits", "errors", "results")
+
+    def __init__(self, item):
+        paths = item if isinstance(item, (list, tuple)) else [item]
+        self.label = str(paths[0]) if len(paths) == 1 else f"{paths[0]} (+{len(paths) - 1} more)"
+        for field in self.COUNTERS:
+            setattr(self, field, 0)
+        self.files = len(paths)
+        for file_path in paths:
+            if isinstance(file_path, ByteRange):
+                self.bytes += file_path.end - file_path.start
+                continue
+            try:
+                self.bytes += os.path.getsize(file_path)
+            except OSError:
+                pass
+
+    def to_dict(self):
+        result = {"path": self.label}
+        result.update((field, getattr(self, field)) for field in self.COUNTERS)
+        return result
+
+def count(field, value=1):
+    record = _record.get()
+    if record is not None:
+        setattr(record, field, getattr(record, field) + value)
+
+@contextmanager
+def timed(field):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        count(field, time.perf_counter() - start)
+
+def timed_iter(iterable, field):
+    iterator = iter(iterable)
+    while True:
+        with timed(field):
+            item = next(iterator, StopIteration)
+        if item is StopIteration:
+            return
+        yield item
+
+def record_call(process_func, item):
+    record = FileRecord(item)
+    token = _record.set(record)
+    start = time.perf_counter()
+    try:
+        results = process_func(item) or []
+    finally:
+        _record.reset(token)
+        record.seconds = time.perf_counter() - start
+    record.results = len(results)
+    return results, record
+
+async def record_coroutine(process_func, item):
+    record = FileRecord(item)
+    token = _record.set(record)
+    start = time.perf_counter()
+    try:
+        results = await process_func(item) or []
+    finally:
+        _record.reset(token)
+        record.seconds = time.perf_counter() - start
+    record.results = len(results)
+    return results, record
+
+class HandlerStats:
+    def __init__(self, name, slowest):
+        self.name = name
+        self.slowest_count = slowest
+        self.calls = 0
+        self.wall_seconds = 0.0
+        self.totals = dict.fromkeys(FileRecord.COUNTERS, 0)
+        self.slowest = []
+
+    def add(self, record):
+        self.calls += 1
+        for field in FileRecord.COUNTERS:
+            self.totals[field] += getattr(record, field)
+        entry = (record.seconds, record.label)
+        if len(self.slowest) < self.slowest_count:
+            heapq.heappush(self.slowest, entry)
+        elif entry > self.slowest[0]:
+            heapq.heapreplace(self.slowest, entry)
+
+    def to_dict(self):
+        result = {"calls": self.calls, "wall_seconds": self.wall_seconds}
+        result.update(self.totals)
+        result["match_seconds"] = max(0.0, self.totals["seconds"] - self.totals["extract_seconds"])
+        result["slowest"] = [{"path": label, "seconds": seconds} for seconds, label in sorted(self.slowest, reverse=True)]
+        return result
+
+class SearchStats:
+    DEFAULT_SLOWEST = 5
+
+    def __init__(self, slowest=DEFAULT_SLOWEST, trace_path=None):
+        self.slowest = slowest
+        self.trace_path = trace_path
+        self.handlers = {}
+        self.scan_seconds = 0.0
+        self.scanned = 0
+        self.sniffed = 0
+        self.skipped = 0
+        self.lock = threading.Lock()
+        self.trace = open(trace_path, "a") if trace_path else None
+
+    def __getstate__(self):
+        return {"slowest": self.slowest}
+
+    def __setstate__(self, state):
+        self.__init__(state["slowest"])
+
+    def handler(self, name):
+        if name not in self.handlers:
+            self.handlers[name] = HandlerStats(name, self.slowest)
+        return self.handlers[name]
+
+    def record(self, name, record):
+        with self.lock:
+            self.handler(name).add(record)
+            if self.trace is not None:
+                event = record.to_dict()
+                event.update(handler=name, time=time.time())
+                self.trace.write(json.dumps(event) + "\n")
+                self.trace.flush()
+
+    def add_wall_time(self, name, seconds):
+        with self.lock:
+            self.handler(name).wall_seconds += seconds
+
+    def add_scan(self, seconds, files):
+        with self.lock:
+            self.scan_seconds += seconds
+            self.scanned += files
+
+    def add_sniff(self, sniffed, skipped):
+        with self.lock:
+            self.sniffed += sniffed
+            self.skipped += skipped
+
+    def close(self):
+        if self.trace is not None:
+            self.trace.close()
+            self.trace = None
+
+    def to_dict(self):
+        return {
+            "scan": {"seconds": self.scan_seconds, "files": self.scanned, "sniffed": self.sniffed, "skipped": self.skipped},
+            "handlers": {name: handler.to_dict() for name, handler in self.handlers.items()},
+        }
+
+    def summary(self):
+        lines = [f"Scanned {self.scanned} files in {self.scan_seconds:.3f}s"]
+        if self.sniffed:
+            lines.append(f"Sniffed {self.sniffed} files, skipped {self.skipped} binary or unmatched files")
+        lines.append("")
+        lines.append(
+            f"{'handler':<18}{'files':>7}{'MB':>9}{'results':>9}{'errors':>8}{'wall s':>9}{'work s':>9}"
+            f"{'extract s':>11}{'match s':>9}{'cached':>8}{'forks':>7}"
+        )
+        slowest = []
+        for name, handler in self.handlers.items():
+            totals = handler.to_dict()
+            lines.append(
+                f"{name:<18}{totals['files']:>7}{totals['bytes'] / (1024 * 1024):>9.1f}{totals['results']:>9}{totals['errors']:>8}"
+                f"{totals['wall_seconds']:>9.2f}{totals['seconds']:>9.2f}{totals['extract_seconds']:>11.2f}"
+                f"{totals['match_seconds']:>9.2f}{totals['cache_hits']:>8}{totals['subprocesses']:>7}"
+            )
+            slowest.extend((entry["seconds"], name, entry["path"]) for entry in totals["slowest"])
+        if slowest:
+            lines.extend(["", "Slowest files:"])
+            for seconds, name, label in sorted(slowest, reverse=True)[:self.slowest]:
+                lines.append(f"  {seconds:>8.3f}s  {name:<18}{label}")
+        return "\n".join(lines)
@@ -0,0 +1,15 @@
+# conftest.py
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import build_parser, create_searcher
+
+@pytest.fixture
+def make_searcher():
+    def make(*argv, search_strings=("needle",)):
+        args = build_parser().parse_args([*search_strings, "--no-cache", *argv])
+        return create_searcher(args, args.paths)
+    return make
@@ -0,0 +1,72 @@
+# test_archive_handler.py
+import gzip
+import io
+import os
+import zipfile
+import pytest
+
+MEMBERS = {
+    "inner/keep.txt": b"a needle\n",
+    "inner/doc.md": b"a needle\n",
+    "inner/skip.log": b"a needle\n",
+    "inner/NOTES": b"a needle\n",
+    "inner/blob": gzip.compress(b"a needle\n"),
+    "inner/miss.txt": b"nothing\n",
+}
+
+@pytest.fixture
+def archive(tmp_path):
+    path = tmp_path / "arc.zip"
+    with zipfile.ZipFile(path, "w") as archive:
+        for name, data in MEMBERS.items():
+            archive.writestr(name, data)
+    return path
+
+@pytest.fixture
+def search(archive, make_searcher):
+    def run(*argv):
+        results = make_searcher("-p", str(archive), *argv).search_files()
+        return sorted(result.path.split("!/", 1)[1] for result in results)
+    return run
+
+def test_members_are_sniffed(search):
+    assert search() == ["inner/NOTES", "inner/blob!/blob", "inner/doc.md", "inner/keep.txt", "inner/skip.log"]
+
+def test_skip_patterns_apply_to_members(search):
+    assert search("-s", ".log") == ["inner/NOTES", "inner/blob!/blob", "inner/doc.md", "inner/keep.txt"]
+
+def test_default_skip_applies_to_members(search):
+    assert "inner/skip.log" not in search("-a")
+
+def test_file_types_apply_to_members(search):
+    assert search("-t", "*.zip", "-s", ".log") == []
+    assert search("-t", "*.zip", "*.txt", "-s", ".log") == ["inner/NOTES", "inner/keep.txt"]
+
+def test_untyped_members_need_sniffing(search):
+    assert search("--no-sniff") == ["inner/doc.md", "inner/keep.txt", "inner/skip.log"]
+
+def test_archives_match_the_extracted_tree(tmp_path, archive, search, make_searcher):
+    extracted = tmp_path / "extracted"
+    with zipfile.ZipFile(archive) as members:
+        members.extractall(extracted)
+    for options in ([], ["-s", ".log"], ["-t", "*.zip", "*.md", "*.txt"], ["--no-sniff"]):
+        on_disk = make_searcher("-p", str(extracted), "--archive-depth", "0", *options).search_files()
+        found = sorted(os.path.relpath(result.path, extracted) for result in on_disk)
+        assert [path for path in search(*options) if "!/" not in path] == found
+
+def test_oversized_gzip_member_is_skipped_despite_its_size_field(tmp_path, make_searcher):
+    data = bytearray(gzip.compress(b"x" * (2 * 1024 * 1024) + b"\na needle\n"))
+    data[-4:] = (10).to_bytes(4, "little")
+    (tmp_path / "big.txt.gz").write_bytes(bytes(data))
+    (tmp_path / "small.txt.gz").write_bytes(gzip.compress(b"a needle\n"))
+    results = make_searcher("-p", str(tmp_path), "--archive-member-size", "1").search_files()
+    assert [os.path.relpath(result.path, tmp_path) for result in results] == ["small.txt.gz!/small.txt"]
+
+def test_nested_archives_stop_at_the_depth_limit(tmp_path, make_searcher):
+    inner = io.BytesIO()
+    with zipfile.ZipFile(inner, "w") as archive:
+        archive.writestr("deep.txt", "a needle\n")
+    with zipfile.ZipFile(tmp_path / "outer.zip", "w") as archive:
+        archive.writestr("inner.zip", inner.getvalue())
+    assert [result.path.split("!/", 1)[1] for result in make_searcher("-p", str(tmp_path)).search_files()] == ["inner.zip!/deep.txt"]
+    assert list(make_searcher("-p", str(tmp_path), "--archive-depth", "1").search_files()) == []
@@ -0,0 +1,68 @@
+# test_cache.py
+import os
+import pickle
+import time
+import pytest
+from cache import ContentCache
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ContentCache(str(tmp_path / "cache.sqlite"))
+    yield cache
+    cache.close()
+
+@pytest.fixture
+def document(tmp_path):
+    path = tmp_path / "doc.txt"
+    path.write_text("first")
+    return str(path)
+
+def test_entries_are_keyed_by_file_state(cache, document):
+    cache.put(document, "Handler", 1, os.stat(document), "extracted")
+    assert cache.get(document, "Handler", 1, os.stat(document)) == "extracted"
+    assert cache.get(document, "Handler", 2, os.stat(document)) is None
+    assert cache.get(document, "Other", 1, os.stat(document)) is None
+    with open(document, "w") as file:
+        file.write("second version")
+    assert cache.get(document, "Handler", 1, os.stat(document)) is None
+
+def test_replaced_file_misses_the_cache(cache, document, tmp_path):
+    cache.put(document, "Handler", 1, os.stat(document), "extracted")
+    replacement = tmp_path / "replacement"
+    replacement.write_text("first")
+    stat = os.stat(document)
+    os.utime(replacement, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    os.replace(replacement, document)
+    assert cache.get(document, "Handler", 1, os.stat(document)) is None
+
+def test_eviction_drops_least_recently_used_entries(cache, tmp_path):
+    stats = {}
+    for name in ("a", "b", "c"):
+        path = tmp_path / name
+        path.write_text(name)
+        stats[name] = os.stat(path)
+        cache.put(str(path), "Handler", 1, stats[name], name * 10)
+        time.sleep(0.01)
+    assert cache.get(str(tmp_path / "a"), "Handler", 1, stats["a"]) == "a" * 10
+    assert cache.prune(20) == 1
+    assert cache.get(str(tmp_path / "b"), "Handler", 1, stats["b"]) is None
+    assert cache.get(str(tmp_path / "a"), "Handler", 1, stats["a"]) == "a" * 10
+    assert cache.get(str(tmp_path / "c"), "Handler", 1, stats["c"]) == "c" * 10
+
+def test_prune_removes_missing_and_changed_files(cache, document):
+    cache.put(document, "Handler", 1, os.stat(document), "extracted")
+    cache.put_sniff(document, 1, os.stat(document), "text")
+    os.unlink(document)
+    assert cache.prune() == 2
+
+def test_sniff_results_are_cached(cache, document):
+    assert cache.get_sniff(document, 1, os.stat(document)) is None
+    cache.put_sniff(document, 1, os.stat(document), "*.pdf")
+    assert cache.get_sniff(document, 1, os.stat(document)) == "*.pdf"
+    assert cache.get_sniff(document, 2, os.stat(document)) is None
+
+def test_pickled_caches_share_one_instance_per_process(cache):
+    first = pickle.loads(pickle.dumps(cache))
+    second = pickle.loads(pickle.dumps(cache))
+    assert first is second
+    assert (first.path, first.max_size) == (cache.path, cache.max_size)
@@ -0,0 +1,74 @@
+# test_cluster.py
+import io
+import json
+import os
+import pytest
+from cluster import Coordinator, LocalWorkers, Shard, ShardWorker
+from models import FileResult, Match
+
+class FakeConnection:
+    def __init__(self):
+        self.sent = []
+
+    def sendall(self, data):
+        self.sent.append(json.loads(data))
+
+def result(path, term="needle"):
+    return {"result": FileResult(path, "*.txt", matches=[Match(term, "a needle", line=1)]).to_dict()}
+
+def stream(*messages):
+    return io.BytesIO(b"".join(json.dumps(message).encode() + b"\n" for message in messages))
+
+def drain(coordinator):
+    found = []
+    while not coordinator.results.empty():
+        message = coordinator.results.get_nowait()
+        found.append((message.path, message.matches[0].term))
+    return found
+
+def test_replayed_results_are_not_emitted_twice(make_searcher):
+    coordinator = Coordinator(["unix:/nonexistent"], [], make_searcher("-p", "."))
+    shard = Shard(1, items=[["/a", "*.jpg"], ["/b", "*.txt"]])
+    with pytest.raises(ConnectionError):
+        coordinator.run_shard(FakeConnection(), stream(result("/a"), result("/a", "other")), shard)
+    assert drain(coordinator) == [("/a", "needle"), ("/a", "other")]
+    coordinator.run_shard(FakeConnection(), stream(result("/a"), result("/a", "other"), result("/b"), {"done": 1}), shard)
+    assert drain(coordinator) == [("/b", "needle")]
+
+def test_identical_results_within_one_attempt_are_kept(make_searcher):
+    coordinator = Coordinator(["unix:/nonexistent"], [], make_searcher("-p", "."))
+    shard = Shard(1, items=[["/a", "*.jpg"]])
+    coordinator.run_shard(FakeConnection(), stream(result("/a"), result("/a"), {"done": 1}), shard)
+    assert drain(coordinator) == [("/a", "needle"), ("/a", "needle")]
+
+def test_worker_error_fails_the_shard(make_searcher):
+    coordinator = Coordinator(["unix:/nonexistent"], [], make_searcher("-p", "."))
+    with pytest.raises(Exception, match="outside the roots"):
+        coordinator.run_shard(FakeConnection(), stream({"error": "/x is outside the roots", "shard": 1}), Shard(1, items=[]))
+
+def test_worker_only_allows_paths_below_its_roots(tmp_path):
+    root = tmp_path / "root"
+    outside = tmp_path / "outside"
+    root.mkdir()
+    outside.mkdir()
+    os.symlink(outside, root / "escape")
+    worker = ShardWorker("unix:/nonexistent", [str(root)])
+    assert worker.allowed(str(root / "file.txt"))
+    assert worker.allowed(str(root))
+    assert not worker.allowed(str(outside / "file.txt"))
+    assert not worker.allowed(str(root / "escape" / "file.txt"))
+    assert not worker.allowed(str(tmp_path / "root-sibling"))
+    sent = []
+    worker.search_shard(None, {"shard": 7, "items": [[str(outside / "file.txt"), "*.txt"]]}, sent.append)
+    assert sent == [{"error": f"{outside / 'file.txt'} is outside the roots of worker unix:/nonexistent", "shard": 7}]
+
+def test_local_workers_find_the_same_files_as_a_local_search(tmp_path, make_searcher, monkeypatch):
+    for number in range(40):
+        (tmp_path / f"{number}.txt").write_text("a needle\n" if number % 3 else "nothing\n")
+    argv = ["needle", "--no-cache", "-l", "-p", str(tmp_path)]
+    searcher = make_searcher("-l", "-p", str(tmp_path))
+    monkeypatch.setattr(Coordinator, "SHARD_SIZE", 8)
+    with LocalWorkers(2, no_cache=True) as workers:
+        found = sorted(result.path for result in Coordinator(workers.addresses, argv, searcher).search())
+    assert found == sorted(result.path for result in searcher.search_files())
+    assert len(found) == 26
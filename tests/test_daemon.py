@@ -0,0 +1,72 @@
+# test_daemon.py
+import os
+import threading
+import time
+import pytest
+from daemon import SearchDaemon
+from index import ContentIndex
+
+def wait_for(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.01)
+
+@pytest.fixture
+def daemon(tmp_path):
+    root = tmp_path / "root"
+    root.mkdir()
+    (root / "a.txt").write_text("old needle\n")
+    (root / "b.txt").write_text("nothing\n")
+    daemon = SearchDaemon([str(root)], socket_path=str(tmp_path / "daemon.sock"), index_path=str(tmp_path / "index.sqlite"))
+    daemon.start()
+    assert daemon.index_ready.wait(10)
+    yield daemon
+    daemon.close()
+
+@pytest.fixture
+def candidates(daemon, make_searcher):
+    def run():
+        items, _ = daemon.items(make_searcher("-p", daemon.roots[0]), True)
+        return sorted(path.rsplit("/", 1)[1] for path, _ in items)
+    return run
+
+def test_queued_changes_are_searched_before_they_are_indexed(daemon, candidates, monkeypatch):
+    release = threading.Event()
+    refresh = ContentIndex.refresh
+    monkeypatch.setattr(ContentIndex, "refresh", lambda self, *args: release.wait(10) and refresh(self, *args))
+    root = daemon.roots[0]
+    assert candidates() == ["a.txt"]
+    with open(root + "c.txt", "w") as file:
+        file.write("new needle\n")
+    with open(root + "b.txt", "w") as file:
+        file.write("now a needle\n")
+    daemon.refresh([root + "c.txt", root + "b.txt"], [])
+    assert candidates() == ["a.txt", "b.txt", "c.txt"]
+    release.set()
+    wait_for(lambda: not daemon.index_pending)
+    assert candidates() == ["a.txt", "b.txt", "c.txt"]
+
+def test_rescan_searches_the_listing_until_the_index_is_rebuilt(daemon, candidates, monkeypatch):
+    release = threading.Event()
+    update = ContentIndex.update
+    monkeypatch.setattr(ContentIndex, "update", lambda self: release.wait(10) and update(self))
+    daemon.refresh([], [], rescan=True)
+    assert not daemon.index_ready.is_set()
+    assert candidates() == ["a.txt", "b.txt"]
+    release.set()
+    assert daemon.index_ready.wait(10)
+    assert candidates() == ["a.txt"]
+
+def test_removed_files_leave_the_listing_and_the_index(daemon, candidates):
+    root = daemon.roots[0]
+    os.unlink(root + "a.txt")
+    daemon.refresh([], [root + "a.txt"])
+    assert root + "a.txt" not in dict(daemon.table.entries())
+    index = ContentIndex(daemon.index_path)
+    try:
+        wait_for(lambda: not index.connect().execute("SELECT COUNT(*) FROM files WHERE path = ?", (root + "a.txt",)).fetchone()[0])
+    finally:
+        index.close()
+    assert candidates() == []
@@ -0,0 +1,40 @@
+# test_grep_handler.py
+import shutil
+import pytest
+
+TEXT = "one beta\nalpha two alpha\nbeta three\nalpha beta\nx ümlaut beta\n"
+
+def matches(results):
+    return [(result.path, [(match.term, match.line, match.offset, match.snippet) for match in result.matches]) for result in results]
+
+@pytest.mark.skipif(shutil.which("grep") is None, reason="grep is not installed")
+@pytest.mark.parametrize("options", [
+    [],
+    ["-m", "1"],
+    ["-m", "2"],
+    ["-m", "3"],
+    ["--first-match"],
+    ["-m", "1", "--all-terms"],
+    ["-m", "2", "--all-terms"],
+    ["-c", "-m", "2"],
+    ["-f", "-m", "2"],
+])
+def test_grep_reports_the_same_matches_as_the_native_matcher(tmp_path, make_searcher, options):
+    (tmp_path / "a.txt").write_text(TEXT, encoding="utf-8")
+    argv = ["-p", str(tmp_path), *options]
+    native = matches(make_searcher(*argv, search_strings=("beta", "alpha")).search_files())
+    grep = matches(make_searcher(*argv, "--grep", search_strings=("beta", "alpha")).search_files())
+    assert grep == native
+    assert native
+
+@pytest.mark.skipif(shutil.which("grep") is None, reason="grep is not installed")
+def test_grep_max_count_spans_all_terms(tmp_path, make_searcher):
+    (tmp_path / "a.txt").write_text(TEXT, encoding="utf-8")
+    results = make_searcher("-p", str(tmp_path), "-m", "2", "--grep", search_strings=("beta", "alpha")).search_files()
+    assert [(match.term, match.line) for result in results for match in result.matches] == [("beta", 1), ("alpha", 2)]
+
+def test_parse_matches_splits_lines_into_term_matches(make_searcher):
+    handler = make_searcher("-p", ".", search_strings=("beta", "alpha")).create_handler("*.txt")
+    output = "doc.pdf:3:alpha and beta\ndoc.pdf:4:no match here\nother.pdf:5:beta\n"
+    found = handler.parse_matches(output, "doc.pdf", "page")
+    assert [(match.term, match.page, match.line) for match in found] == [("alpha", 3, None), ("beta", 3, None), ("beta", 4, None)]
@@ -0,0 +1,66 @@
+# test_index.py
+import os
+import pytest
+from index import ContentIndex
+
+@pytest.fixture
+def tree(tmp_path, make_searcher):
+    for directory in ("a", "other"):
+        os.makedirs(tmp_path / directory)
+        for name in ("x.txt", "y.md", "z.log", "README"):
+            (tmp_path / directory / name).write_text("a needle here\n")
+        (tmp_path / directory / "miss.txt").write_text("nothing\n")
+    index_path = str(tmp_path / "index.sqlite")
+    index = ContentIndex(index_path, make_searcher("-p", str(tmp_path)))
+    index.build()
+    index.close()
+    return index_path
+
+@pytest.fixture
+def query(tmp_path, tree, make_searcher):
+    def run(*argv):
+        index = ContentIndex(tree, make_searcher(*argv))
+        try:
+            return sorted(os.path.relpath(result.path, tmp_path) for result in index.query())
+        finally:
+            index.close()
+    return run
+
+@pytest.fixture
+def search(tmp_path, make_searcher):
+    def run(*argv):
+        return sorted(os.path.relpath(result.path, tmp_path) for result in make_searcher(*argv).search_files())
+    return run
+
+@pytest.mark.parametrize("options", [
+    [],
+    ["-t", "*.md"],
+    ["-t", "*.md", "*.txt"],
+    ["-s", ".log"],
+    ["--no-sniff"],
+])
+@pytest.mark.parametrize("scope", [".", "other", "a/x.txt"])
+def test_query_matches_a_normal_search(tmp_path, query, search, scope, options):
+    argv = ["-p", os.path.normpath(str(tmp_path / scope)), *options]
+    assert query(*argv) == search(*argv)
+
+def test_query_is_scoped_to_search_paths(tmp_path, query):
+    assert query("-p", str(tmp_path / "other")) == ["other/README", "other/x.txt", "other/y.md", "other/z.log"]
+
+def test_covers(tmp_path, tree, make_searcher):
+    assert ContentIndex(tree, make_searcher("-p", str(tmp_path / "a"))).covers()
+    assert not ContentIndex(tree, make_searcher("-p", str(tmp_path.parent))).covers()
+
+def test_missing_index_does_not_cover_and_is_not_created(tmp_path, make_searcher):
+    index_path = str(tmp_path / "missing.sqlite")
+    assert not ContentIndex(index_path, make_searcher("-p", str(tmp_path))).covers()
+    assert not os.path.exists(index_path)
+
+def test_candidates_skip_files_without_the_trigrams(tmp_path, tree, make_searcher):
+    index = ContentIndex(tree, make_searcher("-p", str(tmp_path)))
+    try:
+        paths = {os.path.basename(path) for path, _ in index.candidates(["needle"])}
+    finally:
+        index.close()
+    assert "miss.txt" not in paths
+    assert "x.txt" in paths
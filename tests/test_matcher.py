@@ -0,0 +1,40 @@
+# test_matcher.py
+import pytest
+from matcher import Matcher
+
+def test_plain_terms_share_one_expression():
+    matcher = Matcher(["foo", "ba+r"])
+    assert matcher.combined is not None
+    assert matcher.separate == []
+    assert matcher.matched_terms("xx BAAR yy") == ["ba+r"]
+
+def test_groups_keep_their_own_numbering():
+    matcher = Matcher([r"(a)\1", r"(?P<x>b)(?P=x)", r"(c)?(?(1)d|e)", "plain"])
+    assert len(matcher.separate) == 3
+    assert matcher.matched_terms("aa bb e plain") == [r"(a)\1", r"(?P<x>b)(?P=x)", r"(c)?(?(1)d|e)", "plain"]
+
+def test_duplicate_group_names_across_terms():
+    matcher = Matcher([r"(?P<word>foo)", r"(?P<word>bar)"])
+    assert matcher.matched_terms("bar") == [r"(?P<word>bar)"]
+
+@pytest.mark.parametrize("case_sensitive", [False, True])
+@pytest.mark.parametrize("term", ["(?i)needle", "(?m)^needle", "(?u)needle", "(?im)^needle"])
+def test_global_inline_flags_are_not_combined(term, case_sensitive):
+    matcher = Matcher([term, "other"], case_sensitive=case_sensitive)
+    assert [pattern.pattern for pattern in matcher.separate] == [term]
+    assert matcher.combined.pattern == "(?:other)"
+    assert matcher.matched_terms("x\nneedle y") == [term]
+
+def test_differing_flags_are_kept_separate():
+    matcher = Matcher(["(?s)a.b", "c"], case_sensitive=True)
+    assert matcher.search("a\nb")
+    assert not Matcher(["a.b"], case_sensitive=True).search("a\nb")
+
+def test_find_matches_are_in_text_order():
+    matcher = Matcher(["beta", "alpha"])
+    assert [term for _, _, term in matcher.find_matches("alpha beta alpha")] == ["alpha", "beta", "alpha"]
+
+def test_fixed_strings_are_escaped():
+    matcher = Matcher(["a.c", "(?i)"], fixed=True)
+    assert matcher.matched_terms("abc") == []
+    assert matcher.matched_terms("a.c (?i)") == ["a.c", "(?i)"]
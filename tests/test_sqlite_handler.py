@@ -0,0 +1,26 @@
+# test_sqlite_handler.py
+import sqlite3
+import pytest
+
+@pytest.fixture
+def broken_database(tmp_path):
+    path = tmp_path / "bad.sqlite"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE good (x)")
+    conn.execute("INSERT INTO good VALUES ('a needle')")
+    conn.commit()
+    conn.execute("PRAGMA writable_schema=ON")
+    conn.execute("INSERT INTO sqlite_master VALUES ('table', 'bad', 'bad', 0, 'CREATE VIRTUAL TABLE bad USING nosuch()')")
+    conn.commit()
+    conn.close()
+    return path
+
+def test_table_errors_are_reported_once(broken_database, make_searcher):
+    with pytest.raises(Exception) as error:
+        list(make_searcher("-p", str(broken_database)).search_files())
+    assert str(error.value).count(str(broken_database)) == 1
+    assert "table bad: no such module: nosuch" in str(error.value)
+
+def test_ignored_table_errors_keep_other_tables(broken_database, make_searcher):
+    results = list(make_searcher("-p", str(broken_database), "-i").search_files())
+    assert [(match.table, match.rowid) for result in results for match in result.matches] == [("good", 1)]
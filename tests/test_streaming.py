@@ -0,0 +1,40 @@
+# test_streaming.py
+import io
+import pytest
+from matcher import MatchCollector, MatchPolicy, Matcher
+
+def locations(matches):
+    return [(match.term, match.line, match.offset, match.snippet) for match in matches]
+
+def scan(matcher, data, chunk_size):
+    matcher.CHUNK_SIZE = chunk_size
+    collector = MatchCollector(MatchPolicy(), matcher.term_count)
+    return locations(matcher.scan_stream(io.BytesIO(data), collector).matches)
+
+@pytest.mark.parametrize("chunk_size", [48, 64, 100, 1024])
+def test_chunks_find_matches_across_boundaries(chunk_size):
+    text = "".join(f"line {number} with a needle and ümlauts\n" if number % 3 else f"line {number}\n" for number in range(60))
+    matcher = Matcher(["needle", "ümlauts"], context=4)
+    assert scan(matcher, text.encode(), chunk_size) == locations(matcher.match_text(text, 1, 0))
+
+@pytest.mark.parametrize("chunk_size", [48, 100])
+def test_long_lines_keep_an_overlap(chunk_size):
+    text = ("x" * 37 + "needle") * 50 + "\nend needle"
+    matcher = Matcher(["needle"], context=4)
+    found = scan(matcher, text.encode(), chunk_size)
+    assert [(term, line, offset) for term, line, offset, _ in found] == [(term, line, offset) for term, line, offset, _ in locations(matcher.match_text(text, 1, 0))]
+    assert len(found) == 51
+
+def test_split_ranges_match_an_unsplit_search(tmp_path, make_searcher):
+    path = tmp_path / "big.txt"
+    block = "filler " * 20 + "\n"
+    with open(path, "w") as file:
+        for number in range(40000):
+            file.write(f"{number} needle here\n" if number % 997 == 0 else block)
+        file.write("x" * (3 * 1024 * 1024) + " needle " + "y" * 100 + "\n")
+    def run(split_size):
+        results = list(make_searcher("-p", str(path), "--split-size", split_size).search_files())
+        return [(match.line, match.offset) for result in results for match in result.matches]
+    split = run("1")
+    assert split == run("0")
+    assert len(split) == 42
@@ -0,0 +1,213 @@
+# watcher.py
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import time
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+class InotifyWatcher:
+    MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+    EVENT = struct.Struct("iIII")
+    READ_SIZE = 64 * 1024
+    DEBOUNCE = 0.2
+    MAX_DELAY = 2.0
+
+    def __init__(self, roots, callback, verbose=False):
+        self.roots = [root.rstrip('/') or '/' for root in roots]
+        self.callback = callback
+        self.verbose = verbose
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        self.directories = {}
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def verbose_print(self, *messages):
+        if self.verbose:
+            print(" ".join(messages))
+
+    def start(self):
+        for root in self.roots:
+            self.watch_tree(root)
+        self.thread = threading.Thread(target=self.run, name="watcher", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+        os.close(self.fd)
+
+    def watch(self, directory):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), self.MASK | IN_ONLYDIR | IN_DONT_FOLLOW)
+        if wd < 0:
+            error = ctypes.get_errno()
+            self.verbose_print(f"Cannot watch {directory}: {os.strerror(error)}")
+            return False
+        self.directories[wd] = directory
+        return True
+
+    def watch_tree(self, root, files=None):
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            if not self.watch(directory):
+                continue
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif files is not None and entry.is_file(follow_symlinks=False):
+                            files.add(entry.path)
+            except OSError as e:
+                self.verbose_print(f"Cannot watch {directory}: {e}")
+
+    def unwatch_tree(self, root):
+        prefix = root + "/"
+        for wd, directory in list(self.directories.items()):
+            if directory == root or directory.startswith(prefix):
+                self.libc.inotify_rm_watch(self.fd, wd)
+                del self.directories[wd]
+
+    def read_events(self):
+        try:
+            data = os.read(self.fd, self.READ_SIZE)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = self.EVENT.unpack_from(data, offset)
+            offset += self.EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            yield wd, mask, name
+
+    def run(self):
+        changed, removed = set(), set()
+        rescan = False
+        first = last = None
+        while not self.stop_event.is_set():
+            ready, _, _ = select.select([self.fd], [], [], self.DEBOUNCE)
+            now = time.monotonic()
+            if ready:
+                for wd, mask, name in self.read_events():
+                    if mask & IN_Q_OVERFLOW:
+                        rescan = True
+                    elif mask & IN_IGNORED:
+                        self.directories.pop(wd, None)
+                    elif wd in self.directories:
+                        self.handle(self.directories[wd], mask, name, changed, removed)
+                first = first or now
+                last = now
+            if first is not None and (now - last >= self.DEBOUNCE or now - first >= self.MAX_DELAY):
+                changed -= removed
+                try:
+                    self.callback(sorted(changed), sorted(removed), rescan)
+                except Exception as e:
+                    self.verbose_print(f"Refreshing changed files failed: {e}")
+                changed, removed = set(), set()
+                rescan = False
+                first = last = None
+
+    def handle(self, directory, mask, name, changed, removed):
+        path = os.path.join(directory, name) if name else directory
+        if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+            removed.add(path)
+            return
+        if mask & (IN_DELETE | IN_MOVED_FROM):
+            removed.add(path)
+            changed.discard(path)
+            if mask & IN_ISDIR:
+                self.unwatch_tree(path)
+            return
+        removed.discard(path)
+        if mask & IN_ISDIR:
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                self.watch_tree(path, changed)
+            return
+        changed.add(path)
+
+class PollingWatcher:
+    INTERVAL = 5.0
+
+    def __init__(self, roots, callback, verbose=False, interval=None):
+        self.roots = [root.rstrip('/') or '/' for root in roots]
+        self.callback = callback
+        self.verbose = verbose
+        self.interval = interval or self.INTERVAL
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.files = {}
+
+    def verbose_print(self, *messages):
+        if self.verbose:
+            print(" ".join(messages))
+
+    def start(self):
+        self.files = self.snapshot()
+        self.thread = threading.Thread(target=self.run, name="watcher", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+
+    def snapshot(self):
+        files = {}
+        stack = list(self.roots)
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            stat = entry.stat(follow_symlinks=False)
+                            files[entry.path] = (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+            except OSError:
+                continue
+        return files
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            files = self.snapshot()
+            changed = sorted(path for path, signature in files.items() if self.files.get(path) != signature)
+            removed = sorted(path for path in self.files if path not in files)
+            self.files = files
+            if changed or removed:
+                try:
+                    self.callback(changed, removed, False)
+                except Exception as e:
+                    self.verbose_print(f"Refreshing changed files failed: {e}")
+
+def create_watcher(roots, callback, verbose=False):
+    try:
+        return InotifyWatcher(roots, callback, verbose)
+    except (OSError, AttributeError) as e:
+        if verbose:
+            print(f"inotify is not available ({e}), polling for changes instead.")
+        return PollingWatcher(roots, callback, verbose)